@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core.apps.CoreConfig',
     'rest_framework',
     'rest_framework.authtoken',
@@ -52,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,9 +95,35 @@ DATABASES = {
         'PASSWORD': os.environ['DB_PASSWORD'],
         'HOST': os.environ['DB_HOST'],
         'PORT': os.environ.get('DB_PORT', "5432"),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DB_CONN_HEALTH_CHECKS', 1))
+        ),
     }
 }
 
+# psycopg3 connection pool, one per server worker process. Django manages
+# connection reuse through the pool instead of CONN_MAX_AGE when enabled,
+# and CONN_HEALTH_CHECKS makes the pool check connections on checkout.
+if bool(int(os.environ.get('DB_POOL', 0))):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 600)),
+        },
+    }
+
+# Async list/retrieve views for recipes, tags and ingredients, used when
+# serving app.asgi (which turns this on). Async views run their queries in
+# short-lived per-request threads, so without the pool connections must not
+# outlive the request.
+ASYNC_API_VIEWS = bool(int(os.environ.get('ASYNC_API_VIEWS', 0)))
+if ASYNC_API_VIEWS and 'OPTIONS' not in DATABASES['default']:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -115,6 +144,43 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Loads the user's API token along with the user, for the token endpoint.
+AUTHENTICATION_BACKENDS = ['user.backends.TokenModelBackend']
+
+# Password hashing. New passwords use the first hasher; the others only
+# verify older hashes, which are rehashed with the first on next login.
+# PASSWORD_HASHER picks argon2 (needs argon2-cffi), scrypt or pbkdf2.
+PASSWORD_HASHER_CLASSES = {
+    'argon2': 'user.hashers.Argon2PasswordHasher',
+    'scrypt': 'user.hashers.ScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+if PASSWORD_HASHER == 'argon2' and not importlib.util.find_spec('argon2'):
+    PASSWORD_HASHER = 'scrypt'
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CLASSES.items()
+      if name != PASSWORD_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASHING = {
+    'ARGON2_TIME_COST': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),
+    'ARGON2_PARALLELISM': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+}
+
+# At most this many logins hash passwords at once. The slots live in the
+# database, so this is one count for the whole deployment, shared by all
+# app hosts and workers: raise it when adding replicas. Others wait up to
+# MAX_WAIT_MS for a slot, then get a 429 with Retry-After. 0 turns the
+# cap off.
+LOGIN_THROTTLE = {
+    'MAX_CONCURRENT_LOGINS': int(os.environ.get('MAX_CONCURRENT_LOGINS', 4)),
+    'MAX_WAIT_MS': int(os.environ.get('LOGIN_MAX_WAIT_MS', 500)),
+    'RETRY_AFTER': int(os.environ.get('LOGIN_RETRY_AFTER', 1)),
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -141,9 +207,78 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'user.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson-backed; both fall back to DRF's stdlib JSON without orjson.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_MAX_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 60)),
+    # Without a shared cache, how long other processes may still accept a
+    # deleted token or a deactivated user.
+    'LOCAL_TTL': int(os.environ.get('TOKEN_AUTH_CACHE_LOCAL_TTL', 5)),
+    'CACHE_ALIAS': os.environ.get('TOKEN_AUTH_CACHE_ALIAS') or None,
+}
+
+# Rendered list/detail bodies are keyed by the user's LibraryVersion, so a
+# per-process cache is safe; the version itself lives in the database.
+RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300)),
+}
+
+# ?since= delta sync; purge_tombstones drops tombstones past retention.
+DELTA_SYNC = {
+    'TOMBSTONE_RETENTION_DAYS': int(
+        os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    ),
+    'OVERLAP_SECONDS': int(os.environ.get('SYNC_OVERLAP_SECONDS', 5)),
+}
+
+# /recipes/{id}/similar/ keeps an in-memory index per user library in each
+# worker process; this many libraries are kept, least recently used out.
+RECIPE_SIMILARITY = {
+    'MAX_LIBRARIES': int(os.environ.get('SIMILARITY_MAX_LIBRARIES', 32)),
+    'DEFAULT_RESULTS': 10,
+    'MAX_RESULTS': 50,
+}
+
+# Query count, DB time and repeated-statement (N+1) reporting per request,
+# as Server-Timing headers and JSON logs. Off by default; when off the
+# middleware unloads itself at startup.
+QUERY_INSTRUMENTATION = {
+    'ENABLED': bool(int(os.environ.get('QUERY_INSTRUMENTATION', 0))),
+    'SERVER_TIMING': bool(int(os.environ.get('QUERY_SERVER_TIMING', 1))),
+    'LOG_ALL': bool(int(os.environ.get('QUERY_LOG_ALL', 0))),
+    'MAX_QUERIES': int(os.environ.get('QUERY_MAX_QUERIES', 50)),
+    'MAX_DB_MS': float(os.environ.get('QUERY_MAX_DB_MS', 500)),
+    'MAX_REPEATS': int(os.environ.get('QUERY_MAX_REPEATS', 10)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -0,0 +1,238 @@
+"""Scripted load scenarios against a running API server.
+
+Seed users, start a server against the same database, then run from
+the ``app`` directory::
+
+    python manage.py seed_benchmark_data --users 10 --recipes 500
+    python manage.py runserver --noreload 8000
+    python -m benchmarks.api_load --base-url http://127.0.0.1:8000 \\
+        --output bench.json
+
+Each scenario runs for ``--seconds`` with ``--concurrency`` client
+threads, spreading requests over the seeded users:
+
+* ``token_auth``: obtain a token with email and password.
+* ``list``: first page of the recipe list.
+* ``filter``: recipes with any of the user's two most used tags.
+* ``create``: a recipe with nested tags and ingredients.
+* ``image_upload``: a small JPEG uploaded to one of the user's recipes.
+
+Requests per second and p50/p95/p99 latency come from the HTTP run.
+Queries per request are counted in this process by replaying each
+scenario through Django's test client after a warm-up request, so this
+process must use the server's database settings (``--no-queries`` skips
+it). The results are written as sorted, indented JSON so runs from two
+commits can be diffed, or compared with ``benchmarks.compare``.
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+from urllib.parse import urlencode
+
+from benchmarks import loadgen
+
+SCENARIOS = ["token_auth", "list", "filter", "create", "image_upload"]
+PAGE_SIZE = 50
+BOUNDARY = "BenchBoundary"
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def jpeg_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 120, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class Library:
+    """What a scenario needs to know about one seeded user."""
+
+    def __init__(self, email, token, tag_ids, recipe_id):
+        self.email = email
+        self.token = token
+        self.tag_ids = tag_ids
+        self.recipe_id = recipe_id
+
+
+def load_libraries(base_url, emails, password):
+    libraries = []
+    for email in emails:
+        status, body = loadgen.send(
+            base_url, "POST", "/api/user/token/",
+            {"Content-Type": "application/json"},
+            json.dumps({"email": email, "password": password}).encode(),
+        )
+        if status != 200:
+            raise SystemExit(
+                f"Could not log in as {email} ({status}); "
+                "run seed_benchmark_data first."
+            )
+        token = json.loads(body)["token"]
+        headers = {"Authorization": f"Token {token}"}
+        _, body = loadgen.send(
+            base_url, "GET", "/api/recipe/tags/?ordering=popular", headers,
+        )
+        tag_ids = [tag["id"] for tag in json.loads(body)[:2]]
+        _, body = loadgen.send(
+            base_url, "GET", "/api/recipe/recipes/?page_size=1&fields=id",
+            headers,
+        )
+        recipe_id = json.loads(body)["results"][0]["id"]
+        libraries.append(Library(email, token, tag_ids, recipe_id))
+    return libraries
+
+
+def build_request(scenario, library, n, password, image):
+    """``(method, path, headers, body, expected status)`` for one request."""
+    headers = {
+        "Authorization": f"Token {library.token}",
+        "Accept": "application/json",
+    }
+    if scenario == "token_auth":
+        return (
+            "POST", "/api/user/token/",
+            {"Content-Type": "application/json"},
+            json.dumps({"email": library.email, "password": password}).encode(),
+            200,
+        )
+    if scenario == "list":
+        query = urlencode({"page_size": PAGE_SIZE})
+        return "GET", f"/api/recipe/recipes/?{query}", headers, None, 200
+    if scenario == "filter":
+        query = urlencode({
+            "tags": ",".join(map(str, library.tag_ids)),
+            "page_size": PAGE_SIZE,
+        })
+        return "GET", f"/api/recipe/recipes/?{query}", headers, None, 200
+    if scenario == "create":
+        body = json.dumps({
+            "title": f"Benchmark recipe {n}",
+            "time_minutes": 25,
+            "price": "6.50",
+            "tags": [{"name": "Dinner"}, {"name": f"Batch {n % 20}"}],
+            "ingredients": [{"name": "Salt"}, {"name": "Rice"}],
+        }).encode()
+        headers["Content-Type"] = "application/json"
+        return "POST", "/api/recipe/recipes/", headers, body, 201
+    if scenario == "image_upload":
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test.client import encode_multipart
+
+        body = encode_multipart(BOUNDARY, {
+            "image": SimpleUploadedFile(
+                f"bench-{n}.jpg", image, content_type="image/jpeg"
+            ),
+        })
+        headers["Content-Type"] = f"multipart/form-data; boundary={BOUNDARY}"
+        path = f"/api/recipe/recipes/{library.recipe_id}/upload-image/"
+        return "POST", path, headers, body, 200
+    raise ValueError(scenario)
+
+
+def run_scenario(base_url, scenario, libraries, args, image):
+    def request(n):
+        library = libraries[n % len(libraries)]
+        method, path, headers, body, expected = build_request(
+            scenario, library, n, args.password, image
+        )
+        status, _ = loadgen.send(base_url, method, path, headers, body)
+        return status == expected
+
+    return loadgen.run(request, args.concurrency, args.seconds)
+
+
+def count_queries(scenario, library, password, image):
+    """Queries for one warm request, replayed through the test client."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    if "testserver" not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+    client = Client()
+    counts = []
+    for n in range(2):
+        method, path, headers, body, expected = build_request(
+            scenario, library, n, password, image
+        )
+        content_type = headers.pop("Content-Type", "")
+        with CaptureQueriesContext(connection) as queries:
+            res = client.generic(
+                method, path, body or "", content_type, headers=headers
+            )
+        if res.status_code != expected:
+            return None
+        counts.append(len(queries))
+    return counts[-1]
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from core.management.commands.seed_benchmark_data import DEFAULT_PASSWORD
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--email-prefix", default="bench-user-")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS,
+        help="Run only this scenario; may be repeated.",
+    )
+    parser.add_argument("--no-queries", action="store_true")
+    parser.add_argument("--output", help="Write results to this file.")
+    args = parser.parse_args(argv)
+
+    emails = [
+        f"{args.email_prefix}{n}@example.com" for n in range(args.users)
+    ]
+    libraries = load_libraries(args.base_url, emails, args.password)
+    image = jpeg_bytes()
+
+    scenarios = {}
+    for scenario in args.scenario or SCENARIOS:
+        result = run_scenario(
+            args.base_url, scenario, libraries, args, image
+        )
+        if not args.no_queries:
+            result["queries_per_request"] = count_queries(
+                scenario, libraries[0], args.password, image
+            )
+        scenarios[scenario] = result
+
+    report = json.dumps({
+        "meta": {
+            "git_commit": git_commit(),
+            "base_url": args.base_url,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "seconds": args.seconds,
+        },
+        "scenarios": scenarios,
+    }, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
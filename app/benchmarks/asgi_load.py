@@ -0,0 +1,168 @@
+"""Load test the API under uWSGI (WSGI) and uvicorn (ASGI) with a slow DB.
+
+Run from the ``app`` directory against a migrated database::
+
+    python -m benchmarks.asgi_load --concurrency 64 --seconds 20
+
+Each server is started as a subprocess with the same number of workers,
+serving ``benchmarks.slow_db`` so that every query takes at least
+``--db-delay-ms``. Client threads then hammer the recipe, tag and
+ingredient list endpoints for ``--seconds``. A throwaway query parameter
+defeats the response cache, so every request reaches Postgres. Results
+(requests per second, p50/p95/p99 latency, errors) are printed as JSON.
+Servers that are not installed are reported as skipped.
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import time
+
+from benchmarks import loadgen
+
+BENCH_EMAIL = "bench-asgi-load@example.com"
+PATHS = [
+    "/api/recipe/recipes/",
+    "/api/recipe/tags/",
+    "/api/recipe/ingredients/",
+]
+RECIPES = 50
+TAGS = 10
+
+
+def seed():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from decimal import Decimal
+
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+
+    from core.models import Ingredient, Recipe, Tag
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCH_EMAIL)
+    token, _ = Token.objects.get_or_create(user=user)
+    if not Recipe.objects.filter(user=user).exists():
+        tags = [
+            Tag.objects.create(user=user, name=f"Tag {i}")
+            for i in range(TAGS)
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=user, name=f"Ingredient {i}")
+            for i in range(TAGS)
+        ]
+        for i in range(RECIPES):
+            recipe = Recipe.objects.create(
+                user=user,
+                title=f"Recipe {i}",
+                time_minutes=10,
+                price=Decimal("5.00"),
+            )
+            recipe.tags.add(tags[i % TAGS], tags[(i + 1) % TAGS])
+            recipe.ingredients.add(ingredients[i % TAGS])
+    return token.key
+
+
+def server_commands(port, workers):
+    commands = {}
+    if shutil.which("uwsgi"):
+        commands["wsgi"] = [
+            "uwsgi", "--http", f"127.0.0.1:{port}",
+            "--module", "benchmarks.slow_db:application",
+            "--workers", str(workers), "--master", "--enable-threads",
+            "--disable-logging", "--die-on-term",
+        ]
+    if shutil.which("uvicorn"):
+        commands["asgi"] = [
+            "uvicorn", "benchmarks.slow_db:application",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log",
+            "--log-level", "warning",
+        ]
+    return commands
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start.")
+
+
+def load(port, token, concurrency, seconds):
+    base_url = f"http://127.0.0.1:{port}"
+    headers = {
+        "Authorization": f"Token {token}",
+        "Accept": "application/json",
+    }
+
+    def request(n):
+        path = f"{PATHS[n % len(PATHS)]}?_={n}"
+        status, _ = loadgen.send(base_url, "GET", path, headers)
+        return status == 200
+
+    return loadgen.run(request, concurrency, seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--db-delay-ms", type=float, default=100)
+    parser.add_argument("--warmup", type=float, default=2)
+    args = parser.parse_args(argv)
+
+    token = seed()
+    env = {
+        **os.environ,
+        "BENCH_DB_DELAY_MS": str(args.db_delay_ms),
+        "ALLOWED_HOSTS": "127.0.0.1",
+    }
+
+    results = []
+    for mode in ("wsgi", "asgi"):
+        result = {
+            "server": mode,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "db_delay_ms": args.db_delay_ms,
+        }
+        port = free_port()
+        commands = server_commands(port, args.workers)
+        if mode not in commands:
+            results.append({**result, "skipped": "server not installed"})
+            continue
+        server = subprocess.Popen(
+            commands[mode],
+            env={**env, "ASYNC_API_VIEWS": "1" if mode == "asgi" else "0"},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(port)
+            load(port, token, args.concurrency, args.warmup)
+            result.update(load(port, token, args.concurrency, args.seconds))
+        finally:
+            server.terminate()
+            server.wait(30)
+        results.append(result)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
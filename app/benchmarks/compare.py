@@ -0,0 +1,61 @@
+"""Compare two ``benchmarks.api_load`` result files.
+
+Run from the ``app`` directory::
+
+    python -m benchmarks.compare before.json after.json
+
+Prints one line per scenario and metric with both values and the
+relative change, so a regression between two commits stands out.
+"""
+import argparse
+import json
+
+METRICS = [
+    "requests_per_second",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "queries_per_request",
+    "errors",
+]
+
+
+def change(before, after):
+    if before is None or after is None:
+        return "n/a"
+    if before == 0:
+        return "n/a" if after == 0 else "new"
+    return f"{(after - before) / before:+.1%}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(
+        f"{before['meta'].get('git_commit')} -> "
+        f"{after['meta'].get('git_commit')}"
+    )
+    scenarios = list(dict.fromkeys(
+        [*before["scenarios"], *after["scenarios"]]
+    ))
+    for scenario in scenarios:
+        old = before["scenarios"].get(scenario, {})
+        new = after["scenarios"].get(scenario, {})
+        for metric in METRICS:
+            a, b = old.get(metric), new.get(metric)
+            print(
+                f"{scenario:<14} {metric:<20} {str(a):>10} {str(b):>10} "
+                f"{change(a, b):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
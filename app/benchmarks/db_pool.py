@@ -0,0 +1,114 @@
+"""Compare API throughput with and without database connection reuse.
+
+Run from the ``app`` directory against a migrated database::
+
+    python -m benchmarks.db_pool --requests 2000 --concurrency 4
+
+Each mode runs in its own process so that the database settings are
+picked up fresh: ``none`` opens a connection per request, ``persistent``
+keeps one per thread via ``CONN_MAX_AGE`` and ``pool`` uses the psycopg3
+connection pool, sized to ``--concurrency``. Results are printed as JSON.
+
+Requests go through Django's test client, which leaves connection
+handling out of its request cycle. Each request is therefore wrapped in
+``close_old_connections()``, the handler a real server runs on
+``request_started`` and ``request_finished``. That is what closes a
+connection in ``none`` mode and returns it to the pool in ``pool`` mode.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    "none": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "1"},
+}
+BENCH_EMAIL = "bench-db-pool@example.com"
+URL = "/api/recipe/tags/"
+
+
+def run_mode(mode, requests, concurrency):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections, connections
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    user, _ = get_user_model().objects.get_or_create(email=BENCH_EMAIL)
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+    connections.close_all()
+
+    def worker(count):
+        client = Client()
+        for _ in range(count):
+            close_old_connections()
+            try:
+                res = client.get(URL, **headers)
+            finally:
+                close_old_connections()
+            assert res.status_code == 200, res.status_code
+        connections.close_all()
+
+    per_worker = requests // concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, [per_worker] * concurrency))
+    elapsed = time.perf_counter() - start
+
+    total = per_worker * concurrency
+    return {
+        "mode": mode,
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        result = run_mode(args.mode, args.requests, args.concurrency)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for mode, env in MODES.items():
+        out = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.db_pool",
+                "--mode", mode,
+                "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency),
+            ],
+            env={
+                **os.environ,
+                "DB_POOL_MAX_SIZE": str(args.concurrency),
+                **env,
+            },
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare DRF's stdlib JSON renderer/parser with the orjson-backed ones.
+
+Run from the ``app`` directory::
+
+    python -m benchmarks.json_render --recipes 1000 --repeat 20
+
+The payload mimics a recipe detail list with nested tags and
+ingredients. ``serialized`` holds what serializers emit (strings for
+prices and timestamps); ``native`` holds raw ``Decimal``, ``datetime``
+and ``UUID`` values, as ``values()``-based code would. Results are
+printed as JSON with the median time in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+
+NESTED_PER_RECIPE = 5
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def nested(i, n, native):
+    stamp = START + timedelta(minutes=i * NESTED_PER_RECIPE + n)
+    return {
+        "id": i * NESTED_PER_RECIPE + n,
+        "name": f"Item {n}",
+        "created_at": stamp if native else stamp.isoformat(),
+        "updated_at": stamp if native else stamp.isoformat(),
+    }
+
+
+def payload(recipes, native):
+    rows = []
+    for i in range(recipes):
+        stamp = START + timedelta(hours=i)
+        price = Decimal("12.50") + i
+        rows.append({
+            "id": i,
+            "uuid": uuid.UUID(int=i) if native else str(uuid.UUID(int=i)),
+            "title": f"Recipe {i}: crème brûlée",
+            "slug": f"recipe-{i}",
+            "price": price if native else str(price),
+            "time_minutes": 30,
+            "ingredients": [
+                nested(i, n, native) for n in range(NESTED_PER_RECIPE)
+            ],
+            "tags": [nested(i, n, native) for n in range(NESTED_PER_RECIPE)],
+            "image": None,
+            "image_renditions": {},
+            "link": "",
+            "description": "Whisk, bake and chill overnight. " * 4,
+            "created_at": stamp if native else stamp.isoformat(),
+            "updated_at": stamp if native else stamp.isoformat(),
+        })
+    return rows
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer
+
+    pairs = {
+        "stdlib": (JSONRenderer(), JSONParser()),
+        "orjson": (ORJSONRenderer(), ORJSONParser()),
+    }
+    results = []
+    for kind in ("serialized", "native"):
+        data = payload(args.recipes, native=kind == "native")
+        body = JSONRenderer().render(data)
+        for name, (renderer, json_parser) in pairs.items():
+            results.append({
+                "payload": kind,
+                "impl": name,
+                "recipes": args.recipes,
+                "bytes": len(body),
+                "identical": renderer.render(data) == body,
+                "render_ms": timed(lambda: renderer.render(data), args.repeat),
+                "parse_ms": timed(
+                    lambda: json_parser.parse(BytesIO(body)), args.repeat
+                ),
+            })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""A small threaded HTTP load generator shared by the load benchmarks."""
+import http.client
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def send(base_url, method, path, headers=None, body=None):
+    """One request on a fresh connection; returns ``(status, body)``."""
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        res = conn.getresponse()
+        return res.status, res.read()
+    finally:
+        conn.close()
+
+
+def run(request, concurrency, seconds):
+    """Call ``request(n)`` from ``concurrency`` threads for ``seconds``.
+
+    ``request`` returns True for a successful response; anything else,
+    including a raised ``OSError`` or ``HTTPException``, is an error.
+    Returns throughput and latency percentiles in milliseconds.
+    """
+    counter = itertools.count()
+    deadline = time.monotonic() + seconds
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            n = next(counter)
+            start = time.perf_counter()
+            try:
+                ok = request(n)
+            except (OSError, http.client.HTTPException):
+                ok = False
+            if ok:
+                local.append((time.perf_counter() - start) * 1000)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        result[f"p{pct}_ms"] = None if value is None else round(value, 1)
+    return result
@@ -0,0 +1,106 @@
+"""Password checks per second, per core, for each configured hasher.
+
+A login costs one password check, so this is the ceiling on logins per
+second a server core can sustain. Run from the ``app`` directory::
+
+    python -m benchmarks.password_hashing --processes 4 --seconds 5
+
+For each hasher (``--hasher`` to pick) a password is hashed once with
+the settings in effect, then ``--processes`` worker processes check it
+in a loop for ``--seconds``. ``per_core`` divides by the cores actually
+used, ``min(processes, cpu_count)``. Results are printed as sorted JSON,
+with the hasher's parameters, so they can be kept next to ``api_load``
+runs. No database is needed.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HASHERS = {
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "scrypt": "user.hashers.ScryptPasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD = "benchpass123"
+
+
+def _setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+
+def _hasher(name):
+    from django.utils.module_loading import import_string
+
+    return import_string(HASHERS[name])()
+
+
+def check_loop(name, encoded, seconds):
+    """Check ``encoded`` until ``seconds`` pass; return the count."""
+    _setup()
+    hasher = _hasher(name)
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        assert hasher.verify(PASSWORD, encoded)
+        count += 1
+    return count
+
+
+def run(name, processes, seconds):
+    hasher = _hasher(name)
+    try:
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+    except ValueError as exc:
+        # The argon2 hasher without argon2-cffi installed.
+        return {"error": str(exc)}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes) as pool:
+        counts = list(pool.map(
+            check_loop, [name] * processes, [encoded] * processes,
+            [seconds] * processes,
+        ))
+    elapsed = time.perf_counter() - start
+    cores = min(processes, os.cpu_count() or 1)
+    total = sum(counts) / seconds
+    return {
+        "params": hasher.safe_summary(encoded),
+        "checks": sum(counts),
+        "checks_per_second": round(total, 1),
+        "per_core": round(total / cores, 1),
+        "ms_per_check": round(1000 * seconds * processes / sum(counts), 2),
+        "wall_seconds": round(elapsed, 2),
+    }
+
+
+def main(argv=None):
+    _setup()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--hasher", action="append", choices=list(HASHERS),
+        help="Measure only this hasher; may be repeated.",
+    )
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args(argv)
+
+    results = {
+        name: run(name, args.processes, args.seconds)
+        for name in args.hasher or HASHERS
+    }
+    print(json.dumps({
+        "meta": {
+            "processes": args.processes,
+            "cpu_count": os.cpu_count(),
+            "seconds": args.seconds,
+        },
+        "hashers": results,
+    }, indent=2, sort_keys=True, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Compare JOIN + DISTINCT tag filtering with EXISTS semi-joins.
+
+Run from the ``app`` directory against a migrated database::
+
+    python -m benchmarks.recipe_filters --recipes 100000 --repeat 5
+
+A benchmark user is seeded with ``--recipes`` recipes spread over
+``--tags`` tags (reused on later runs). Each strategy then fetches the
+first page and counts the matches, for the "any" and "all" modes.
+Results are printed as JSON with the median time in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+BENCH_EMAIL = "bench-recipe-filters@example.com"
+PAGE_SIZE = 50
+TAGS_PER_RECIPE = 3
+FILTER_TAGS = 2
+BATCH_SIZE = 10000
+
+
+def seed(user, recipes, tags):
+    from decimal import Decimal
+
+    from django.db import connection
+
+    from core.models import Recipe, Tag
+
+    have = Recipe.objects.filter(user=user).count()
+    tag_objs = list(Tag.objects.filter(user=user).order_by("id"))
+    if have >= recipes and len(tag_objs) >= tags:
+        return tag_objs[:tags]
+
+    Recipe.objects.filter(user=user).delete()
+    Tag.objects.filter(user=user).delete()
+    tag_objs = Tag.objects.bulk_create([
+        Tag(user=user, name=f"Tag {i}", slug=f"bench-{user.pk}-tag-{i}")
+        for i in range(tags)
+    ])
+    through = Recipe.tags.through
+    for start in range(0, recipes, BATCH_SIZE):
+        batch = Recipe.objects.bulk_create([
+            Recipe(
+                user=user,
+                title=f"Recipe {i}",
+                slug=f"bench-{user.pk}-recipe-{i}",
+                time_minutes=10,
+                price=Decimal("1.00"),
+            )
+            for i in range(start, min(start + BATCH_SIZE, recipes))
+        ])
+        through.objects.bulk_create([
+            through(recipe_id=recipe.pk, tag_id=tag.pk)
+            for n, recipe in enumerate(batch, start=start)
+            for tag in {
+                tag_objs[(n * (k + 1) + k) % tags]
+                for k in range(TAGS_PER_RECIPE)
+            }
+        ])
+
+    with connection.cursor() as cursor:
+        for table in ("core_recipe", "core_tag", "core_recipe_tags"):
+            cursor.execute(f"ANALYZE {table}")
+    return tag_objs
+
+
+def strategies(user, tag_ids):
+    from django.db.models import Count
+
+    from core.models import Recipe
+
+    base = Recipe.objects.for_user(user).order_by("-id")
+    return {
+        ("distinct", "any"): base.filter(tags__id__in=tag_ids).distinct(),
+        # What an AND filter takes without semi-joins: group and count.
+        ("distinct", "all"): base.filter(tags__id__in=tag_ids)
+        .annotate(matched=Count("tags"))
+        .filter(matched=len(tag_ids)),
+        ("exists", "any"): base.with_tags(tag_ids, "any"),
+        ("exists", "all"): base.with_tags(tag_ids, "all"),
+    }
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(samples), 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+
+    user, _ = get_user_model().objects.get_or_create(email=BENCH_EMAIL)
+    tag_ids = [tag.pk for tag in seed(user, args.recipes, args.tags)]
+    tag_ids = tag_ids[:FILTER_TAGS]
+
+    results = []
+    for (strategy, match), queryset in strategies(user, tag_ids).items():
+        # Warm the plan cache and buffers before timing.
+        list(queryset[:PAGE_SIZE])
+        _, page_ms = timed(
+            lambda: list(queryset[:PAGE_SIZE]), args.repeat
+        )
+        count, count_ms = timed(queryset.count, args.repeat)
+        results.append({
+            "strategy": strategy,
+            "match": match,
+            "recipes": args.recipes,
+            "matches": count,
+            "page_ms": page_ms,
+            "count_ms": count_ms,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Latency of the similar-recipes index on a large seeded library.
+
+Seed one large library, then run from the ``app`` directory::
+
+    python manage.py seed_benchmark_data --users 1 --recipes 100000 \\
+        --email-prefix bench-similar-
+    python -m benchmarks.similar_recipes --email bench-similar-0@example.com
+
+Reports how long the first (full) index build takes, how long an
+incremental refresh takes after a handful of link changes, and
+p50/p95/p99 for ``--queries`` top-k lookups on random recipes. Results
+are printed as sorted JSON.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from benchmarks.loadgen import percentile
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from core.models import Recipe, Tag
+    from recipe import similarity
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--email", default="bench-similar-0@example.com")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--metric", choices=similarity.METRICS,
+                        default=similarity.JACCARD)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    user = get_user_model().objects.get(email=args.email)
+    rng = random.Random(args.seed)
+    cache = similarity.SimilarityIndexCache(1)
+
+    index, build_ms = timed(cache.get, user.pk)
+    ids = index.ids.tolist()
+
+    tags = list(Tag.objects.filter(user=user))
+    for recipe in Recipe.objects.filter(pk__in=rng.sample(ids, args.changes)):
+        recipe.tags.add(rng.choice(tags))
+    index, refresh_ms = timed(cache.get, user.pk)
+
+    latencies = []
+    for _ in range(args.queries):
+        _, elapsed = timed(
+            index.similar, rng.choice(ids), args.limit, args.metric
+        )
+        latencies.append(elapsed)
+    latencies.sort()
+
+    print(json.dumps({
+        "recipes": len(ids),
+        "links": len(index.features),
+        "build_ms": round(build_ms, 1),
+        "refresh_ms": round(refresh_ms, 1),
+        "changes": args.changes,
+        "query_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+        },
+        "limit": args.limit,
+        "metric": args.metric,
+    }, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""WSGI and ASGI entry points with every database query slowed down.
+
+Used by ``benchmarks.asgi_load`` to stand in for a loaded or distant
+Postgres: each query sleeps ``BENCH_DB_DELAY_MS`` before it runs.
+"""
+import os
+import time
+
+from django.db.backends.signals import connection_created
+
+DELAY = float(os.environ.get("BENCH_DB_DELAY_MS", 100)) / 1000
+
+
+def _slow_query(execute, sql, params, many, context):
+    time.sleep(DELAY)
+    return execute(sql, params, many, context)
+
+
+def _install(sender, connection, **kwargs):
+    if _slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_slow_query)
+
+
+connection_created.connect(_install)
+
+if os.environ.get("ASYNC_API_VIEWS") == "1":
+    from app.asgi import application  # noqa: E402,F401
+else:
+    from app.wsgi import application  # noqa: E402,F401
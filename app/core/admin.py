@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Q
 from django.utils.translation import gettext as _
 
 from core import models
@@ -45,6 +47,19 @@ class RecipeAdmin(admin.ModelAdmin):
     list_select_related = ("user",)
     # prepopulated_fields = {"slug": ("title",)}
 
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields only drives the search box; matching goes through
+        # the GIN-indexed search_vector instead of ILIKE scans.
+        if not search_term:
+            return queryset, False
+        query = SearchQuery(
+            search_term,
+            config=models.SEARCH_CONFIG,
+            search_type="websearch",
+        )
+        matches = Q(search_vector=query) | Q(slug=search_term)
+        return queryset.filter(matches), False
+
 
 @admin.register(models.Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -52,11 +67,12 @@ class TagAdmin(admin.ModelAdmin):
         "name",
         "user",
         "slug",
+        "recipe_count",
         "created_at"
     )
     list_filter = ("user", "created_at")
     search_fields = ("name", "slug")
-    readonly_fields = ("slug", "created_at", "updated_at")
+    readonly_fields = ("slug", "recipe_count", "created_at", "updated_at")
     ordering = ("-created_at",)
     list_select_related = ("user",)
 
@@ -66,10 +82,11 @@ class IngredientAdmin(admin.ModelAdmin):
     list_display = (
         "name",
         "user",
+        "recipe_count",
         "created_at"
     )
     list_filter = ("user", "created_at")
     search_fields = ("name",)
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("recipe_count", "created_at", "updated_at")
     ordering = ("-created_at",)
     list_select_related = ("user",)
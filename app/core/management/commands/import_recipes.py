@@ -0,0 +1,51 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe import importers
+
+
+class Command(BaseCommand):
+    help = "Bulk import recipes for a user from a JSON Lines or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or '-' for stdin.")
+        parser.add_argument("--user", required=True, help="Owner's email.")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=importers.FORMATS,
+            help="Input format; guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=importers.DEFAULT_CHUNK_SIZE,
+            help="Rows validated and written per transaction.",
+        )
+
+    def handle(self, *args, path, user, file_format, chunk_size, **options):
+        try:
+            owner = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {user!r}.")
+
+        file_format = file_format or importers.guess_format(path)
+        if path == "-":
+            importer = self._import(sys.stdin, owner, file_format, chunk_size)
+        else:
+            with open(path, encoding="utf-8-sig", newline="") as lines:
+                importer = self._import(lines, owner, file_format, chunk_size)
+
+        for error in importer.errors:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} recipes, "
+            f"{len(importer.errors)} rows failed."
+        ))
+
+    def _import(self, lines, owner, file_format, chunk_size):
+        records = importers.parse(lines, file_format)
+        return importers.RecipeImporter(owner, chunk_size).run(records)
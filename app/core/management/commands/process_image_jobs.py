@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from recipe import images
+
+
+class Command(BaseCommand):
+    help = "Work through queued recipe image jobs, writing resized renditions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+
+    def handle(self, *args, once, interval, **options):
+        requeued = images.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+        while True:
+            processed = images.run_pending()
+            if processed:
+                self.stdout.write(f"Processed {processed} image jobs.")
+            if once:
+                return
+            time.sleep(interval)
+            # Like the end of a request: before the next poll, drop a
+            # connection that broke or outlived CONN_MAX_AGE while idle.
+            close_old_connections()
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Tombstone
+from recipe.sync import conf
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete delta sync tombstones older than the retention period. "
+        "Clients that last synced before then get a 410 and resync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Keep this many days of tombstones (defaults to "
+                 "DELTA_SYNC['TOMBSTONE_RETENTION_DAYS']).",
+        )
+
+    def handle(self, *args, days, **options):
+        if days is None:
+            days = conf()["TOMBSTONE_RETENTION_DAYS"]
+        if days < 0:
+            raise CommandError("--days must not be negative.")
+
+        cutoff = timezone.now() - timedelta(days=days)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {deleted} tombstones older than {days} days."
+        ))
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Ingredient, Tag
+
+
+class Command(BaseCommand):
+    help = "Recount tag and ingredient recipe_count values that have drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Only reconcile this user's library (by email).",
+        )
+
+    def handle(self, *args, user, **options):
+        owner = None
+        if user:
+            try:
+                owner = get_user_model().objects.get(email=user)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {user!r}.")
+
+        fixed = {}
+        for model in (Tag, Ingredient):
+            queryset = model.objects.all()
+            if owner is not None:
+                queryset = queryset.filter(user=owner)
+            fixed[model] = queryset.reconcile_recipe_counts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {fixed[Tag]} tag and "
+            f"{fixed[Ingredient]} ingredient counts."
+        ))
@@ -0,0 +1,198 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from core.models import Ingredient, Recipe, Tag
+
+BATCH_SIZE = 5000
+DEFAULT_PASSWORD = "benchpass123"
+TAG_NAMES = [
+    "Dinner", "Lunch", "Breakfast", "Vegetarian", "Vegan", "Quick",
+    "Dessert", "Italian", "Mexican", "Indian", "Thai", "Chinese",
+    "Japanese", "Gluten free", "Healthy", "Comfort food", "Soup", "Salad",
+    "Baking", "Spicy", "Budget", "One pot", "Snack", "Party", "Grill",
+    "Seafood", "Kids", "Meal prep", "Slow cooker", "Low carb",
+]
+INGREDIENT_NAMES = [
+    "Salt", "Olive oil", "Garlic", "Onion", "Black pepper", "Butter",
+    "Eggs", "Flour", "Sugar", "Milk", "Tomato", "Lemon", "Chicken breast",
+    "Rice", "Parsley", "Basil", "Ginger", "Soy sauce", "Carrot", "Potato",
+    "Cheddar", "Parmesan", "Cumin", "Paprika", "Chili flakes", "Honey",
+    "Coconut milk", "Spinach", "Mushrooms", "Bell pepper", "Beef mince",
+    "Pasta", "Cream", "Yogurt", "Chickpeas", "Lentils", "Salmon",
+    "Prawns", "Tofu", "Coriander", "Lime", "Avocado", "Bread", "Oats",
+]
+TITLE_WORDS = (
+    ["Quick", "Spicy", "Creamy", "Classic", "Smoky", "Crispy", "Easy",
+     "Roasted", "Grandma's", "Weeknight"],
+    ["chicken", "lentil", "mushroom", "salmon", "tofu", "beef", "veggie",
+     "coconut", "tomato", "prawn"],
+    ["curry", "soup", "stew", "pasta", "salad", "tacos", "stir fry",
+     "risotto", "bake", "pie"],
+)
+
+
+def _names(pool, count):
+    """``count`` distinct names, numbering the pool once it runs out."""
+    names = []
+    for i in range(count):
+        cycle, index = divmod(i, len(pool))
+        names.append(f"{pool[index]} {cycle + 1}" if cycle else pool[index])
+    return names
+
+
+def _popularity(count, skew):
+    """Zipf-like weights: a few items are on most recipes."""
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Create benchmark users with recipes, tags and ingredients. "
+        "Tag and ingredient use follows a long-tailed distribution."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument(
+            "--recipes", type=int, default=200, help="Recipes per user."
+        )
+        parser.add_argument(
+            "--tags", type=int, default=len(TAG_NAMES), help="Tags per user."
+        )
+        parser.add_argument(
+            "--ingredients",
+            type=int,
+            default=len(INGREDIENT_NAMES),
+            help="Ingredients per user.",
+        )
+        parser.add_argument(
+            "--tags-per-recipe", type=int, nargs=2, default=(1, 4),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument(
+            "--ingredients-per-recipe", type=int, nargs=2, default=(3, 10),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.0,
+            help="Zipf exponent for tag and ingredient popularity.",
+        )
+        parser.add_argument(
+            "--email-prefix",
+            default="bench-user-",
+            help="Users are <prefix><n>@example.com.",
+        )
+        parser.add_argument("--password", default=DEFAULT_PASSWORD)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete existing benchmark users first; otherwise they "
+                 "are left as they are.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("tags_per_recipe", "ingredients_per_recipe"):
+            low, high = options[name]
+            if not 0 <= low <= high:
+                raise CommandError(f"Invalid --{name.replace('_', '-')}.")
+        if options["tags_per_recipe"][1] > options["tags"]:
+            raise CommandError("--tags-per-recipe exceeds --tags.")
+        if options["ingredients_per_recipe"][1] > options["ingredients"]:
+            raise CommandError(
+                "--ingredients-per-recipe exceeds --ingredients."
+            )
+
+        User = get_user_model()
+        emails = [
+            f"{options['email_prefix']}{n}@example.com"
+            for n in range(options["users"])
+        ]
+        if options["reset"]:
+            User.objects.filter(email__in=emails).delete()
+        existing = set(
+            User.objects.filter(email__in=emails).values_list(
+                "email", flat=True
+            )
+        )
+
+        rng = random.Random(options["seed"])
+        password = make_password(options["password"])
+        created = 0
+        for email in emails:
+            if email in existing:
+                continue
+            with transaction.atomic():
+                user = User.objects.create(email=email, password=password)
+                self._seed_library(user, rng, options)
+            created += 1
+
+        with connection.cursor() as cursor:
+            for table in ("core_recipe", "core_tag", "core_ingredient",
+                          "core_recipe_tags", "core_recipe_ingredients"):
+                cursor.execute(f"ANALYZE {table}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {created} users with {options['recipes']} recipes each; "
+            f"{len(existing)} already existed."
+        ))
+
+    def _seed_library(self, user, rng, options):
+        tags = Tag.objects.bulk_create([
+            Tag(user=user, name=name, slug=f"{slugify(name)}-u{user.pk}")
+            for name in _names(TAG_NAMES, options["tags"])
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(user=user, name=name)
+            for name in _names(INGREDIENT_NAMES, options["ingredients"])
+        ])
+        tag_weights = _popularity(len(tags), options["skew"])
+        ingredient_weights = _popularity(len(ingredients), options["skew"])
+
+        total = options["recipes"]
+        for start in range(0, total, BATCH_SIZE):
+            recipes = []
+            for n in range(start, min(start + BATCH_SIZE, total)):
+                title = " ".join(rng.choice(words) for words in TITLE_WORDS)
+                recipes.append(Recipe(
+                    user=user,
+                    title=title,
+                    slug=f"{slugify(title)}-u{user.pk}-{n}",
+                    description=(
+                        f"{title}, ready in no time." if rng.random() < 0.6
+                        else ""
+                    ),
+                    time_minutes=rng.randint(5, 120),
+                    price=Decimal(rng.randint(100, 4000)) / 100,
+                ))
+            Recipe.objects.bulk_create(recipes, batch_size=BATCH_SIZE)
+            self._link(Recipe.tags.through, "tag_id", recipes, tags,
+                       tag_weights, options["tags_per_recipe"], rng)
+            self._link(Recipe.ingredients.through, "ingredient_id", recipes,
+                       ingredients, ingredient_weights,
+                       options["ingredients_per_recipe"], rng)
+
+        # The links were bulk inserted, bypassing the counting signals.
+        Tag.objects.filter(user=user).reconcile_recipe_counts()
+        Ingredient.objects.filter(user=user).reconcile_recipe_counts()
+
+    def _link(self, through, column, recipes, targets, weights, bounds, rng):
+        rows = []
+        for recipe in recipes:
+            wanted = rng.randint(*bounds)
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.add(rng.choices(targets, weights)[0].pk)
+            rows.extend(
+                through(recipe_id=recipe.pk, **{column: pk})
+                for pk in chosen
+            )
+        through.objects.bulk_create(rows, batch_size=BATCH_SIZE)
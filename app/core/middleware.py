@@ -0,0 +1,175 @@
+"""Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` counts the queries a request runs,
+sums their database time and notices the same statement being run over
+and over, which is what an N+1 looks like. The numbers go out in a
+``Server-Timing`` header and, for requests over the configured
+thresholds, as a JSON log line on the ``core.middleware`` logger.
+
+Queries are seen through an execute wrapper installed once on each
+connection the request's thread uses. The wrapper reports to whichever
+request owns the current context, so it also sees queries that async
+views run in worker threads. When ``ENABLED`` is off the middleware
+removes itself at startup and nothing is installed.
+
+Queries run while a streaming response is being consumed happen after
+the middleware returns and are not counted.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SERVER_TIMING": True,
+    "LOG_ALL": False,
+    "MAX_QUERIES": 50,
+    "MAX_DB_MS": 500,
+    "MAX_REPEATS": 10,
+}
+# "IN (%s, %s, %s)" and "IN (%s)" are the same statement shape.
+PLACEHOLDER_LIST = re.compile(r"\(%s(?:, %s)*\)")
+
+_collector = ContextVar("query_collector", default=None)
+
+
+def _conf():
+    return {**DEFAULTS, **getattr(settings, "QUERY_INSTRUMENTATION", {})}
+
+
+def _record(execute, sql, params, many, context):
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        collector.add(sql, time.perf_counter() - start)
+
+
+def _install():
+    """Put ``_record`` on this thread's connections, once per connection."""
+    for connection in connections.all():
+        if _record not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_record)
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements[sql] += 1
+
+    def most_repeated(self):
+        """``(times, shape)`` for the statement shape run most often."""
+        shapes = Counter()
+        for sql, times in self.statements.items():
+            shapes[PLACEHOLDER_LIST.sub("(%s, ...)", sql)] += times
+        if not shapes:
+            return 0, None
+        shape, times = shapes.most_common(1)[0]
+        return times, shape
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.conf = _conf()
+        if not self.conf["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        _install()
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        self.report(request, response, collector, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        # Async ORM calls run in the request's thread-sensitive worker.
+        await sync_to_async(_install)()
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+        self.report(request, response, collector, time.perf_counter() - start)
+        return response
+
+    def report(self, request, response, collector, elapsed):
+        conf = self.conf
+        db_ms = collector.duration * 1000
+        total_ms = elapsed * 1000
+        repeats, shape = collector.most_repeated()
+
+        flags = []
+        if collector.count > conf["MAX_QUERIES"]:
+            flags.append("queries")
+        if db_ms > conf["MAX_DB_MS"]:
+            flags.append("db_time")
+        if repeats > conf["MAX_REPEATS"]:
+            flags.append("n_plus_one")
+
+        if conf["SERVER_TIMING"]:
+            metrics = [
+                f'db;dur={db_ms:.2f};desc="{collector.count} queries"',
+                f'db-repeat;desc="{repeats}"',
+                f"total;dur={total_ms:.2f}",
+            ]
+            if flags:
+                metrics.append(f'flagged;desc="{",".join(flags)}"')
+            if response.has_header("Server-Timing"):
+                metrics.insert(0, response["Server-Timing"])
+            response["Server-Timing"] = ", ".join(metrics)
+
+        if flags or conf["LOG_ALL"]:
+            match = getattr(request, "resolver_match", None)
+            data = {
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                "queries": collector.count,
+                "db_ms": round(db_ms, 2),
+                "total_ms": round(total_ms, 2),
+                "max_repeats": repeats,
+                "repeated_sql": shape if repeats > 1 else None,
+                "flags": flags,
+            }
+            logger.log(
+                logging.WARNING if flags else logging.INFO,
+                json.dumps(data),
+                extra={"request_metrics": data},
+            )
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-17 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_recipe_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='library_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Library version',
+                'verbose_name_plural': 'Library versions',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 13:05
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_recipes(apps, schema_editor):
+    Recipe = apps.get_model('core', 'Recipe')
+    for field, target in (('tags', 'tag'), ('ingredients', 'ingredient')):
+        through = getattr(Recipe, field).through
+        model = Recipe._meta.get_field(field).related_model
+        counts = (
+            through.objects.filter(**{target: models.OuterRef('pk')})
+            .values(target)
+            .annotate(n=models.Count('pk'))
+            .values('n')
+        )
+        model.objects.update(
+            recipe_count=Coalesce(models.Subquery(counts), 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_per_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_recipes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', '-recipe_count', '-id'], name='core_ingr_user_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-recipe_count', '-id'], name='core_tag_user_popular_idx'),
+        ),
+    ]
@@ -1,14 +1,28 @@
 import os
 import uuid
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
-from django.utils.text import slugify
+from django.utils import timezone
+
+from core.slugs import UniqueSlugMixin, assign_slugs
+
+
+SEARCH_CONFIG = "english"
 
 
 def recipe_image_file_path(instance, filename):
@@ -69,11 +83,187 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class Recipe(TimeStampedModel):
+class UserNamedQuerySet(models.QuerySet):
+    bulk_retries = 3
+
+    def get_or_create_many(self, user, names):
+        """Map each name to the user's row, bulk-creating missing ones.
+
+        One query fetches what already exists and one ``bulk_create``
+        inserts the rest; a concurrent insert of the same slug makes us
+        look up and try again.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        for attempt in range(self.bulk_retries):
+            found = {}
+            for obj in self.filter(user=user, name__in=names).order_by("id"):
+                found.setdefault(obj.name, obj)
+
+            missing = [
+                self.model(user=user, name=name)
+                for name in names if name not in found
+            ]
+            if not missing:
+                return found
+
+            if issubclass(self.model, UniqueSlugMixin):
+                assign_slugs(missing)
+            try:
+                with transaction.atomic():
+                    self.bulk_create(missing)
+            except IntegrityError:
+                if attempt == self.bulk_retries - 1:
+                    raise
+                continue
+
+            found.update((obj.name, obj) for obj in missing)
+            return found
+
+    def assigned(self):
+        return self.filter(recipe_count__gt=0)
+
+    def add_recipe_counts(self, deltas):
+        """Shift ``recipe_count`` by ``{pk: delta}`` in one UPDATE."""
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        shift = models.Case(
+            *(models.When(pk=pk, then=delta) for pk, delta in deltas.items()),
+            output_field=models.IntegerField(),
+        )
+        # Clamp at zero: drift is the reconcile command's job, not ours.
+        return self.filter(pk__in=deltas).update(
+            recipe_count=Greatest(models.F("recipe_count") + shift, 0),
+            updated_at=timezone.now(),
+        )
+
+    def reconcile_recipe_counts(self):
+        """Recount links for rows whose ``recipe_count`` has drifted.
+
+        Bumps the owners' ``LibraryVersion`` so cached and conditional
+        responses pick up the corrected counts. Returns the number of
+        rows corrected.
+        """
+        rel = self.model._meta.get_field("recipe")
+        target = rel.field.m2m_reverse_field_name()
+        actual = Coalesce(
+            models.Subquery(
+                rel.through.objects.filter(**{target: models.OuterRef("pk")})
+                .values(target)
+                .annotate(n=models.Count("pk"))
+                .values("n")
+            ),
+            0,
+        )
+        drifted = self.exclude(recipe_count=actual)
+        with transaction.atomic(using=self.db):
+            user_ids = set(drifted.values_list("user_id", flat=True))
+            fixed = drifted.update(
+                recipe_count=actual, updated_at=timezone.now()
+            )
+            for user_id in user_ids:
+                LibraryVersion.bump(user_id)
+        return fixed
+
+
+class RecipeQuerySet(models.QuerySet):
+    TAG_FIELDS = ("id", "name", "slug", "created_at", "updated_at")
+    INGREDIENT_FIELDS = ("id", "name", "created_at", "updated_at")
+    MATCH_ANY = "any"
+    MATCH_ALL = "all"
+
+    def for_user(self, user):
+        return self.filter(user=user)
+
+    def with_tags(self, ids, match=MATCH_ANY):
+        return self._with_related("tags", ids, match)
+
+    def with_ingredients(self, ids, match=MATCH_ANY):
+        return self._with_related("ingredients", ids, match)
+
+    def _with_related(self, field, ids, match):
+        """Recipes linked to any (or all) of ``ids`` through ``field``.
+
+        Each condition is an ``EXISTS`` over the through table, so recipe
+        rows are never multiplied by the join and need no ``DISTINCT``.
+        "all" adds one semi-join per id, each an index-only probe of
+        the through table.
+        """
+        m2m = self.model._meta.get_field(field)
+        through = m2m.remote_field.through.objects.filter(
+            **{m2m.m2m_field_name(): models.OuterRef("pk")}
+        )
+        target = m2m.m2m_reverse_field_name()
+        ids = list(dict.fromkeys(ids))
+        if match == self.MATCH_ALL:
+            return self.filter(*(
+                models.Exists(through.filter(**{target: pk})) for pk in ids
+            ))
+        return self.filter(
+            models.Exists(through.filter(**{f"{target}__in": ids}))
+        )
+
+    def search(self, text, headline=True):
+        """Full-text match on title and description, ranked and highlighted.
+
+        Filtering on ``search_vector`` uses its GIN index; ``rank`` and,
+        unless turned off, a ``headline`` snippet with ``<mark>``-ed terms
+        are annotated.
+        """
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = self.filter(search_vector=query).annotate(
+            rank=SearchRank(models.F("search_vector"), query),
+        )
+        if not headline:
+            return queryset
+        return queryset.annotate(
+            headline=SearchHeadline(
+                "description",
+                query,
+                config=SEARCH_CONFIG,
+                start_sel="<mark>",
+                stop_sel="</mark>",
+                max_words=35,
+                min_words=15,
+            ),
+        )
+
+    def with_nested(
+        self, tag_fields=TAG_FIELDS, ingredient_fields=INGREDIENT_FIELDS
+    ):
+        """Prefetch tags and ingredients, loading only the given columns.
+
+        Passing ``None`` for either skips that relation altogether.
+        """
+        lookups = []
+        if tag_fields is not None:
+            lookups.append(models.Prefetch(
+                "tags",
+                queryset=Tag.objects.only(*tag_fields),
+            ))
+        if ingredient_fields is not None:
+            lookups.append(models.Prefetch(
+                "ingredients",
+                queryset=Ingredient.objects.only(*ingredient_fields),
+            ))
+        return self.prefetch_related(*lookups)
+
+
+class RecipeManager(models.Manager.from_queryset(RecipeQuerySet)):
+    def get_queryset(self):
+        # The stored tsvector is only ever read by Postgres itself.
+        return super().get_queryset().defer("search_vector")
+
+
+class Recipe(UniqueSlugMixin, TimeStampedModel):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="recipes",
+        db_index=False,
         )
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
@@ -84,74 +274,230 @@ class Recipe(TimeStampedModel):
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image_renditions = models.JSONField(default=dict, blank=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = RecipeManager()
+
+    slug_source = "title"
+    slug_fallback = "recipe"
 
     class Meta:
         verbose_name = "Recipe"
         verbose_name_plural = "Recipes"
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="core_recipe_user_id_idx"),
+            models.Index(
+                fields=["user", "created_at"],
+                name="core_recipe_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "updated_at"],
+                name="core_recipe_user_updated_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="core_recipe_search_gin"),
+        ]
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title) or "recipe"
-            slug = base_slug
-            counter = 1
-
-            while Recipe.objects.filter(slug=slug).exclude(pk=self.pk).exists(): # noqa
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            self.slug = slug
 
-        super().save(*args, **kwargs)
-
-
-class Tag(TimeStampedModel):
+class Tag(UniqueSlugMixin, TimeStampedModel):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="tags"
+        related_name="tags",
+        db_index=False,
         )
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = UserNamedQuerySet.as_manager()
+
+    slug_source = "name"
+    slug_fallback = "tag"
 
     class Meta:
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="core_tag_user_id_idx"),
+            models.Index(
+                fields=["user", "created_at"],
+                name="core_tag_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "updated_at"],
+                name="core_tag_user_updated_idx",
+            ),
+            models.Index(
+                fields=["user", "-recipe_count", "-id"],
+                name="core_tag_user_popular_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.name) or "tag"
-            slug = base_slug
-            counter = 1
-
-            while Tag.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            self.slug = slug
-
-        super().save(*args, **kwargs)
-
 
 class Ingredient(TimeStampedModel):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="ingredients"
+        related_name="ingredients",
+        db_index=False,
         )
     name = models.CharField(max_length=255)
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = UserNamedQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Ingredient"
         verbose_name_plural = "Ingredients"
         ordering = ["-id"]
+        indexes = [
+            models.Index(
+                fields=["user", "-id"],
+                name="core_ingr_user_id_idx",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                name="core_ingr_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "updated_at"],
+                name="core_ingr_user_updated_idx",
+            ),
+            models.Index(
+                fields=["user", "-recipe_count", "-id"],
+                name="core_ingr_user_popular_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ImageJob(TimeStampedModel):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="image_jobs",
+        )
+    image = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Image job"
+        verbose_name_plural = "Image jobs"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="core_imagejob_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.image} ({self.status})"
+
+
+class Tombstone(models.Model):
+    """A deleted recipe, tag or ingredient, kept for delta sync clients."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tombstones",
+        db_index=False,
+        )
+    kind = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Tombstone"
+        verbose_name_plural = "Tombstones"
+        indexes = [
+            models.Index(
+                fields=["user", "kind", "deleted_at"],
+                name="core_tombstone_sync_idx",
+            ),
+            models.Index(fields=["deleted_at"], name="core_tombstone_age_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class LibraryVersion(models.Model):
+    """When anything in a user's recipes, tags or ingredients last changed."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="library_version",
+        )
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Library version"
+        verbose_name_plural = "Library versions"
+
+    def __str__(self):
+        return f"{self.user_id}@{self.updated_at.isoformat()}"
+
+    @classmethod
+    def bump(cls, user_id):
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [cls(user_id=user_id, updated_at=now)],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["updated_at"],
+        )
+        return now
+
+    @classmethod
+    def current(cls, user_id):
+        updated_at = cls.objects.filter(user_id=user_id).values_list(
+            "updated_at", flat=True
+        ).first()
+        return updated_at or cls.bump(user_id)
+
+    @classmethod
+    async def abump(cls, user_id):
+        now = timezone.now()
+        await cls.objects.abulk_create(
+            [cls(user_id=user_id, updated_at=now)],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["updated_at"],
+        )
+        return now
+
+    @classmethod
+    async def acurrent(cls, user_id):
+        updated_at = await cls.objects.filter(user_id=user_id).values_list(
+            "updated_at", flat=True
+        ).afirst()
+        return updated_at or await cls.abump(user_id)
@@ -0,0 +1,108 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, Max, Q, When
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+# Longest numeric suffix we look at; keeps the cast inside bigint range.
+MAX_SUFFIX_DIGITS = 18
+SLUG_MAX_LENGTH = 255
+
+
+def slug_base(value, fallback):
+    base = slugify(value)[:SLUG_MAX_LENGTH - MAX_SUFFIX_DIGITS - 1]
+    return base.strip("-") or fallback
+
+
+def _suffix_q(base):
+    pattern = rf"^{re.escape(base)}-[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$"
+    return Q(slug__startswith=f"{base}-") & Q(slug__regex=pattern)
+
+
+def allocate_slugs(queryset, bases):
+    """Return a free slug for every entry in ``bases``, in order.
+
+    All bases are resolved with a single aggregate query over the slug
+    index: for each base we learn whether the bare slug is taken and the
+    highest ``<base>-<n>`` suffix in use, then hand out suffixes above
+    it. Repeated bases get consecutive suffixes.
+    """
+    unique_bases = list(dict.fromkeys(bases))
+    if not unique_bases:
+        return []
+
+    where = Q(slug__in=unique_bases)
+    aggregates = {}
+    for i, base in enumerate(unique_bases):
+        suffix_q = _suffix_q(base)
+        where |= suffix_q
+        aggregates[f"taken_{i}"] = Count("pk", filter=Q(slug=base))
+        aggregates[f"top_{i}"] = Max(Case(When(
+            suffix_q,
+            then=Cast(Substr("slug", len(base) + 2), BigIntegerField()),
+        )))
+    row = queryset.filter(where).aggregate(**aggregates)
+
+    state = {
+        base: [not row[f"taken_{i}"], (row[f"top_{i}"] or 0) + 1]
+        for i, base in enumerate(unique_bases)
+    }
+    slugs = []
+    for base in bases:
+        base_free, counter = state[base]
+        if base_free:
+            slugs.append(base)
+            state[base][0] = False
+        else:
+            slugs.append(f"{base}-{counter}")
+            state[base][1] = counter + 1
+    return slugs
+
+
+def assign_slugs(objs):
+    """Give unsaved instances free slugs ahead of a ``bulk_create``."""
+    objs = [obj for obj in objs if not obj.slug]
+    if not objs:
+        return
+    queryset = type(objs[0])._default_manager.all()
+    bases = [obj.get_slug_base() for obj in objs]
+    for obj, slug in zip(objs, allocate_slugs(queryset, bases)):
+        obj.slug = slug
+
+
+class UniqueSlugMixin:
+    """Fill ``slug`` from ``slug_source`` on first save.
+
+    The free slug is computed up front in one query; if a concurrent
+    writer grabs it first, the unique constraint raises and we allocate
+    again instead of probing candidates one by one.
+    """
+    slug_source = None
+    slug_fallback = None
+    slug_retries = 5
+
+    def get_slug_base(self):
+        return slug_base(getattr(self, self.slug_source), self.slug_fallback)
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        base = self.get_slug_base()
+        queryset = type(self)._default_manager.all()
+        if self.pk is not None:
+            queryset = queryset.exclude(pk=self.pk)
+
+        for attempt in range(self.slug_retries):
+            self.slug = allocate_slugs(queryset, [base])[0]
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug, self.slug = self.slug, ""
+                if (
+                    attempt == self.slug_retries - 1
+                    or not queryset.filter(slug=slug).exists()
+                ):
+                    raise
@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import Client
 
+from core.models import Recipe
+
 
 class AdminSiteTests(TestCase):
     def setUp(self):
@@ -36,3 +38,24 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_recipe_search_uses_full_text(self):
+        Recipe.objects.create(
+            user=self.user,
+            title='Roasted tomatoes',
+            description='Slow roasted with garlic',
+            time_minutes=40,
+            price='3.00',
+        )
+        Recipe.objects.create(
+            user=self.user,
+            title='Lemon tart',
+            time_minutes=60,
+            price='8.00',
+        )
+        url = reverse('admin:core_recipe_changelist')
+
+        res = self.client.get(url, {'q': 'tomato'})
+
+        self.assertContains(res, 'Roasted tomatoes')
+        self.assertNotContains(res, 'Lemon tart')
@@ -0,0 +1,179 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag, Tombstone
+
+TAGS_URL = reverse("recipe:tag-list")
+
+
+class ImportRecipesCommandTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+
+    def test_import_jsonl_file(self):
+        rows = [
+            {"title": "Pasta", "time_minutes": 20, "price": "9.99",
+             "tags": [{"name": "Dinner"}]},
+            {"title": "Broken", "time_minutes": 0, "price": "1.00"},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as f:
+            f.write("\n".join(json.dumps(row) for row in rows))
+            f.flush()
+            out, err = StringIO(), StringIO()
+            call_command(
+                "import_recipes", f.name, user=self.user.email,
+                stdout=out, stderr=err,
+            )
+
+        self.assertIn("Imported 1 recipes, 1 rows failed.", out.getvalue())
+        self.assertEqual(json.loads(err.getvalue())["row"], 2)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.tags.get().name, "Dinner")
+
+    def test_import_csv_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("title,time_minutes,price,ingredients\n")
+            f.write("Soup,15,4.50,Water;Salt\n")
+            f.flush()
+            call_command(
+                "import_recipes", f.name, user=self.user.email,
+                stdout=StringIO(), stderr=StringIO(),
+            )
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("import_recipes", "-", user="nobody@example.com")
+
+
+class ReconcileRecipeCountsCommandTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+
+    def test_reconcile(self):
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        Ingredient.objects.create(user=self.user, name="Rice")
+        Tag.objects.filter(pk=tag.pk).update(recipe_count=4)
+        out = StringIO()
+
+        call_command(
+            "reconcile_recipe_counts", user=self.user.email, stdout=out
+        )
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 0)
+        self.assertIn("Reconciled 1 tag and 0 ingredient counts.", out.getvalue())
+
+    def test_cached_tag_list_shows_reconciled_counts(self):
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        Tag.objects.filter(pk=tag.pk).update(recipe_count=4)
+        etag = client.get(TAGS_URL)["ETag"]
+
+        call_command("reconcile_recipe_counts", stdout=StringIO())
+
+        res = client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()[0]["recipe_count"], 0)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("reconcile_recipe_counts", user="nobody@example.com")
+
+
+class SeedBenchmarkDataCommandTests(TestCase):
+    def seed(self, **options):
+        out = StringIO()
+        call_command(
+            "seed_benchmark_data", users=2, recipes=30, tags=8,
+            ingredients=12, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_seeds_users_with_linked_libraries(self):
+        out = self.seed()
+
+        self.assertIn("Seeded 2 users with 30 recipes each", out)
+        user = get_user_model().objects.get(email="bench-user-0@example.com")
+        self.assertTrue(user.check_password("benchpass123"))
+        self.assertEqual(Recipe.objects.filter(user=user).count(), 30)
+        self.assertEqual(Tag.objects.filter(user=user).count(), 8)
+        for recipe in Recipe.objects.filter(user=user):
+            self.assertTrue(1 <= recipe.tags.count() <= 4)
+            self.assertTrue(3 <= recipe.ingredients.count() <= 10)
+
+    def test_counts_are_consistent_and_skewed(self):
+        self.seed()
+
+        self.assertEqual(Tag.objects.reconcile_recipe_counts(), 0)
+        self.assertEqual(Ingredient.objects.reconcile_recipe_counts(), 0)
+        counts = list(
+            Tag.objects.filter(user__email="bench-user-0@example.com")
+            .order_by("id").values_list("recipe_count", flat=True)
+        )
+        self.assertGreater(counts[0], counts[-1])
+
+    def test_existing_users_are_kept_unless_reset(self):
+        self.seed()
+        out = self.seed()
+        self.assertIn("Seeded 0 users", out)
+        self.assertEqual(Recipe.objects.count(), 60)
+
+        self.seed(reset=True)
+        self.assertEqual(Recipe.objects.count(), 60)
+
+    def test_rejects_more_links_than_targets(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "seed_benchmark_data", tags=2, stdout=StringIO()
+            )
+
+
+class PurgeTombstonesCommandTests(TestCase):
+    def test_purges_only_tombstones_past_retention(self):
+        user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        now = timezone.now()
+        old = Tombstone.objects.create(
+            user=user, kind="recipe", object_id=1,
+            deleted_at=now - timedelta(days=31),
+        )
+        recent = Tombstone.objects.create(
+            user=user, kind="recipe", object_id=2,
+            deleted_at=now - timedelta(days=29),
+        )
+
+        out = StringIO()
+        call_command("purge_tombstones", stdout=out)
+
+        self.assertIn("Purged 1 tombstones", out.getvalue())
+        self.assertFalse(Tombstone.objects.filter(pk=old.pk).exists())
+        self.assertTrue(Tombstone.objects.filter(pk=recent.pk).exists())
+
+        call_command("purge_tombstones", "--days", "0", stdout=StringIO())
+        self.assertFalse(Tombstone.objects.exists())
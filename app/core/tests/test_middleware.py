@@ -0,0 +1,127 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.middleware import QueryInstrumentationMiddleware
+from core.models import Recipe, Tag
+
+ENABLED = {"ENABLED": True, "MAX_REPEATS": 3}
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def timings(response):
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.request = RequestFactory().get("/api/recipe/recipes/")
+
+    def middleware(self, view, **conf):
+        with override_settings(QUERY_INSTRUMENTATION={**ENABLED, **conf}):
+            return QueryInstrumentationMiddleware(view)
+
+    def test_unloads_when_disabled(self):
+        with override_settings(QUERY_INSTRUMENTATION={"ENABLED": False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                QueryInstrumentationMiddleware(lambda request: None)
+
+    def test_counts_queries_in_server_timing(self):
+        def view(request):
+            list(Tag.objects.all())
+            list(Recipe.objects.all())
+            return HttpResponse()
+
+        response = self.middleware(view)(self.request)
+
+        metrics = timings(response)
+        self.assertEqual(metrics["db"]["desc"], '"2 queries"')
+        self.assertGreaterEqual(float(metrics["db"]["dur"]), 0)
+        self.assertEqual(metrics["db-repeat"]["desc"], '"1"')
+        self.assertIn("total", metrics)
+        self.assertNotIn("flagged", metrics)
+
+    def test_repeated_statements_are_flagged_and_logged(self):
+        tags = [
+            Tag.objects.create(user=self.user, name=f"Tag {n}")
+            for n in range(5)
+        ]
+
+        def view(request):
+            for tag in tags:
+                Tag.objects.get(pk=tag.pk)
+            return HttpResponse()
+
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            response = self.middleware(view)(self.request)
+
+        self.assertEqual(timings(response)["flagged"]["desc"], '"n_plus_one"')
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data["queries"], 5)
+        self.assertEqual(data["max_repeats"], 5)
+        self.assertEqual(data["flags"], ["n_plus_one"])
+        self.assertIn('"core_tag"', data["repeated_sql"])
+
+    def test_in_lists_of_any_length_share_a_shape(self):
+        def view(request):
+            for n in range(1, 6):
+                list(Tag.objects.filter(pk__in=range(n)))
+            return HttpResponse()
+
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            response = self.middleware(view)(self.request)
+
+        self.assertEqual(timings(response)["db-repeat"]["desc"], '"5"')
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data["flags"], ["n_plus_one"])
+
+    def test_query_and_time_thresholds(self):
+        def view(request):
+            list(Tag.objects.all())
+            list(Recipe.objects.all())
+            return HttpResponse()
+
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            self.middleware(view, MAX_QUERIES=1, MAX_DB_MS=-1)(self.request)
+
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data["flags"], ["queries", "db_time"])
+
+    def test_server_timing_can_be_turned_off(self):
+        response = self.middleware(
+            lambda request: HttpResponse(), SERVER_TIMING=False
+        )(self.request)
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    async def test_async_views_are_counted(self):
+        async def view(request):
+            await Tag.objects.acount()
+            return HttpResponse()
+
+        response = await self.middleware(view)(self.request)
+
+        self.assertEqual(timings(response)["db"]["desc"], '"1 queries"')
+
+    def test_api_requests_are_instrumented(self):
+        with override_settings(QUERY_INSTRUMENTATION=ENABLED):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            with self.assertNoLogs("core.middleware", "WARNING"):
+                res = client.get(TAGS_URL)
+
+        self.assertIn("db", timings(res))
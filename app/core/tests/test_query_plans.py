@@ -0,0 +1,145 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.views import RecipeViewSets, TagViewSets
+
+USERS = 40
+RECIPES_PER_USER = 500
+BIG_LIBRARY = 2000
+TAGS_PER_USER = 50
+
+
+def seed():
+    """Bulk load a multi-user dataset large enough for real plans."""
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(email=f"plan-{i}@example.com", password="x")
+        for i in range(USERS)
+    ])
+    recipes = [
+        Recipe(
+            user=user,
+            title="Recipe",
+            slug=f"recipe-{u}-{i}",
+            time_minutes=10,
+            price=Decimal("1.00"),
+        )
+        for u, user in enumerate(users)
+        for i in range(BIG_LIBRARY if u == 0 else RECIPES_PER_USER)
+    ]
+    Recipe.objects.bulk_create(recipes, batch_size=5000)
+
+    tags = Tag.objects.bulk_create([
+        Tag(user=user, name=f"Tag {i}", slug=f"tag-{user.pk}-{i}")
+        for user in users
+        for i in range(TAGS_PER_USER)
+    ])
+    Ingredient.objects.bulk_create([
+        Ingredient(user=user, name=f"Ingredient {i}")
+        for user in users
+        for i in range(TAGS_PER_USER)
+    ])
+    tags_by_user = {}
+    for tag in tags:
+        tags_by_user.setdefault(tag.user_id, []).append(tag)
+
+    through = Recipe.tags.through
+    through.objects.bulk_create([
+        through(recipe_id=recipe.pk, tag_id=tag.pk)
+        for recipe in recipes
+        for tag in {
+            tags_by_user[recipe.user_id][recipe.pk % TAGS_PER_USER],
+            tags_by_user[recipe.user_id][(recipe.pk * 7 + 3) % TAGS_PER_USER],
+        }
+    ], batch_size=10000)
+
+    with connection.cursor() as cursor:
+        for table in (
+            "core_recipe",
+            "core_tag",
+            "core_ingredient",
+            "core_recipe_tags",
+        ):
+            cursor.execute(f"VACUUM ANALYZE {table}")
+    return users[0], tags_by_user[users[0].pk]
+
+
+class QueryPlanTests(TransactionTestCase):
+    """EXPLAIN the per-user access paths and check the indexes are used."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.user, self.tags = seed()
+
+    def view_queryset(self, viewset, action="list", **params):
+        request = Request(self.factory.get("/", params))
+        request.user = self.user
+        view = viewset(request=request, action=action, format_kwarg=None)
+        return view.get_queryset()
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan, msg=plan)
+        return plan
+
+    def test_recipe_page_walks_user_id_index(self):
+        queryset = self.view_queryset(RecipeViewSets)[:50]
+
+        plan = self.assertUsesIndex(queryset, "core_recipe_user_id_idx")
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_recipe_list_uses_user_index(self):
+        plan = self.view_queryset(RecipeViewSets).explain()
+
+        self.assertIn("core_recipe_user_", plan)
+        self.assertNotIn("Seq Scan on core_recipe ", plan)
+
+    def test_tag_list_uses_user_index(self):
+        plan = self.view_queryset(TagViewSets).explain()
+
+        self.assertIn("core_tag_user_", plan)
+        self.assertNotIn("Seq Scan on core_tag ", plan)
+
+    def test_admin_changelist_uses_user_created_index(self):
+        queryset = Recipe.objects.filter(user=self.user).order_by(
+            "-created_at"
+        )[:100]
+
+        plan = self.assertUsesIndex(queryset, "core_recipe_user_created_idx")
+        self.assertNotIn("Sort", plan)
+
+    def test_recipes_for_tag_use_reverse_through_index(self):
+        through = Recipe.tags.through
+        queryset = through.objects.filter(
+            tag_id__in=[tag.pk for tag in self.tags[:2]]
+        ).values_list("recipe_id")
+
+        plan = self.assertUsesIndex(
+            queryset, "core_recipe_tags_tag_recipe_idx"
+        )
+        self.assertIn("Index Only Scan", plan)
+
+    def test_tag_filters_are_semi_joins(self):
+        for match in ("any", "all"):
+            with self.subTest(match=match):
+                queryset = self.view_queryset(
+                    RecipeViewSets,
+                    tags=f"{self.tags[0].pk},{self.tags[1].pk}",
+                    tags_match=match,
+                )[:50]
+
+                plan = self.assertUsesIndex(
+                    queryset, "core_recipe_tags_tag_recipe_idx"
+                )
+                self.assertNotIn("Unique", plan)
+                self.assertNotIn("HashAggregate", plan)
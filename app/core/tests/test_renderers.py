@@ -0,0 +1,105 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import parsers, renderers
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+PAYLOAD = [
+    {
+        "id": 1,
+        "title": "Crème brûlée\u2028\u2029",
+        "price": Decimal("12.50"),
+        "created_at": datetime(
+            2026, 10, 17, 8, 30, 1, 123456, tzinfo=timezone.utc
+        ),
+        "naive": datetime(2026, 10, 17, 8, 30),
+        "offset": datetime(
+            2026, 10, 17, 8, 30, tzinfo=timezone(timedelta(hours=2))
+        ),
+        "day": date(2026, 10, 17),
+        "duration": timedelta(minutes=5),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Recipe"),
+        "tags": [{"id": 2, "name": "Dessert"}],
+        "renditions": {1: "thumb"},
+        "rank": 0.25,
+        "missing": None,
+    },
+]
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_wide_integers_use_json_renderer(self):
+        data = {"big": 2 ** 70}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_indent_uses_json_renderer(self):
+        context = {"indent": 4}
+
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD, renderer_context=context),
+            JSONRenderer().render(PAYLOAD, renderer_context=context),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(
+                ORJSONRenderer().render(PAYLOAD),
+                JSONRenderer().render(PAYLOAD),
+            )
+
+
+class ORJSONParserTests(SimpleTestCase):
+    body = '{"title": "Crème brûlée", "price": "12.50", "tags": [1, 2]}'
+
+    def test_matches_json_parser(self):
+        data = self.body.encode()
+
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(data)),
+            JSONParser().parse(BytesIO(data)),
+        )
+
+    def test_invalid_json(self):
+        for body in (b"{", b'{"rank": NaN}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    ORJSONParser().parse(BytesIO(body))
+
+    def test_other_encoding_uses_json_parser(self):
+        data = self.body.encode("utf-16")
+
+        parsed = ORJSONParser().parse(
+            BytesIO(data), parser_context={"encoding": "utf-16"}
+        )
+
+        self.assertEqual(parsed["title"], "Crème brûlée")
+
+    def test_without_orjson(self):
+        with mock.patch.object(parsers, "orjson", None):
+            parsed = ORJSONParser().parse(BytesIO(self.body.encode()))
+
+        self.assertEqual(parsed["tags"], [1, 2])
@@ -0,0 +1,110 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import slugs
+from core.models import Recipe, Tag
+
+
+def create_user(email='test@example.com', password='testpass123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+def create_recipe(user, title="Pasta", **params):
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=Decimal("5.00"),
+        **params
+    )
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+
+    def test_first_slug_is_bare(self):
+        recipe = create_recipe(self.user)
+
+        self.assertEqual(recipe.slug, "pasta")
+
+    def test_collisions_get_increasing_suffixes(self):
+        recipes = [create_recipe(self.user) for _ in range(4)]
+
+        self.assertEqual(
+            [r.slug for r in recipes],
+            ["pasta", "pasta-1", "pasta-2", "pasta-3"],
+        )
+
+    def test_slug_is_unique_across_users(self):
+        create_recipe(self.user)
+        other = create_recipe(create_user(email="other@example.com"))
+
+        self.assertEqual(other.slug, "pasta-1")
+
+    def test_similar_prefix_is_not_a_collision(self):
+        create_recipe(self.user, title="Pasta Bake")
+        create_recipe(self.user, title="Pasta 2024")
+
+        self.assertEqual(create_recipe(self.user).slug, "pasta")
+
+    def test_explicit_slug_is_kept(self):
+        recipe = create_recipe(self.user, slug="custom-slug")
+
+        self.assertEqual(recipe.slug, "custom-slug")
+
+    def test_empty_title_uses_fallback(self):
+        self.assertEqual(create_recipe(self.user, title="!!!").slug, "recipe")
+        self.assertEqual(Tag.objects.create(user=self.user, name="").slug, "tag")
+
+    def test_tag_slugs(self):
+        tags = [Tag.objects.create(user=self.user, name="Vegan") for _ in range(3)]
+
+        self.assertEqual([t.slug for t in tags], ["vegan", "vegan-1", "vegan-2"])
+
+    def test_allocate_many_bases_in_one_query(self):
+        create_recipe(self.user)
+        create_recipe(self.user, title="Soup")
+
+        with self.assertNumQueries(1):
+            allocated = slugs.allocate_slugs(
+                Recipe.objects.all(), ["pasta", "soup", "pasta", "salad"]
+            )
+
+        self.assertEqual(allocated, ["pasta-1", "soup-1", "pasta-2", "salad"])
+
+    def test_query_count_constant_as_collisions_grow(self):
+        def queries_for_next_insert():
+            with CaptureQueriesContext(connection) as ctx:
+                create_recipe(self.user)
+            return len(ctx.captured_queries)
+
+        create_recipe(self.user)
+        few = queries_for_next_insert()
+        for _ in range(25):
+            create_recipe(self.user)
+        many = queries_for_next_insert()
+
+        self.assertEqual(few, many)
+
+    def test_retries_when_slug_taken_concurrently(self):
+        create_recipe(self.user)
+        real_allocate = slugs.allocate_slugs
+        calls = []
+
+        def stale_allocate(queryset, bases):
+            calls.append(bases)
+            if len(calls) == 1:
+                return ["pasta"]
+            return real_allocate(queryset, bases)
+
+        with patch("core.slugs.allocate_slugs", side_effect=stale_allocate):
+            recipe = create_recipe(self.user)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(recipe.slug, "pasta-1")
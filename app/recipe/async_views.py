@@ -0,0 +1,152 @@
+"""Async list and retrieve views for the ASGI deployment.
+
+DRF views are synchronous, so under ASGI every request holds a worker
+thread for as long as Postgres takes to answer. With
+``settings.ASYNC_API_VIEWS`` on, ``AsyncReadMixin.as_view()`` returns a
+coroutine view for routes whose GET action is ``list`` or ``retrieve``.
+It runs the usual viewset machinery (request wrapping, content
+negotiation, permissions, throttles, exception handling) but awaits
+authentication, the library version and response cache, and the
+``ReadPlan`` queries through Django's async ORM.
+
+Anything the async path does not cover is handed to the sync view in a
+thread: other methods on the same route, the browsable API, delta sync
+reads, and reads whose serializer has no ``ReadPlan``.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from recipe.sync import SINCE_PARAM
+
+
+class AsyncReadMixin:
+    """Async ``list``/``retrieve`` on top of ``FastReadMixin``.
+
+    List it after ``LibraryCacheMixin``, whose caching it reproduces with
+    ``_acached``, and before ``FastReadMixin``, whose sync handlers it
+    falls back to.
+    """
+    async_actions = {"list", "retrieve"}
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        action = actions.get("get")
+        if not settings.ASYNC_API_VIEWS or action not in cls.async_actions:
+            return sync_view
+        run_sync = sync_to_async(sync_view)
+
+        async def view(request, *args, **kwargs):
+            if request.method != "GET":
+                return await run_sync(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Carries over cls, initkwargs, actions and csrf_exempt, which the
+        # router, drf-spectacular and the CSRF middleware look for.
+        update_wrapper(view, sync_view)
+        del view.__wrapped__
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """``APIView.dispatch`` with authentication and the handler awaited."""
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            if request.accepted_renderer.format == "api":
+                handler = self._sync_handler
+            if self.action in getattr(self, "cached_actions", ()):
+                response = await self._acached(
+                    handler, request, *args, **kwargs
+                )
+            else:
+                response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def aperform_authentication(self, request):
+        """Resolve ``request.user`` and ``request.auth`` without blocking.
+
+        Mirrors ``Request._authenticate``; authenticators without an
+        ``aauthenticate`` method are run in a thread.
+        """
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+            if authenticate is None:
+                authenticate = sync_to_async(authenticator.authenticate)
+            try:
+                user_auth_tuple = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def _sync_handler(self, request, *args, **kwargs):
+        handler = super(AsyncReadMixin, self).list
+        if self.action == "retrieve":
+            handler = super(AsyncReadMixin, self).retrieve
+        return await sync_to_async(handler)(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        if request.query_params.get(SINCE_PARAM) is not None:
+            # Delta sync responses are built by the sync handler.
+            return await self._sync_handler(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_read_plan(queryset)
+        if plan is None:
+            return await self._sync_handler(request, *args, **kwargs)
+
+        paginator = self.paginator
+        if paginator is not None and not hasattr(paginator,
+                                                 "apaginate_queryset"):
+            return await self._sync_handler(request, *args, **kwargs)
+
+        rows = plan.rows(queryset)
+        if paginator is not None:
+            page = await paginator.apaginate_queryset(rows, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(await plan.arender(page))
+        return Response(await plan.arender([row async for row in rows]))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_read_plan(queryset)
+        if plan is None:
+            return await self._sync_handler(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = plan.rows(queryset)
+        try:
+            row = await rows.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (rows.model.DoesNotExist, TypeError, ValueError,
+                ValidationError):
+            raise Http404
+        return Response((await plan.arender([row]))[0])
@@ -0,0 +1,69 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from rest_framework.utils.encoders import JSONEncoder
+
+from recipe.importers import CSV_LIST_SEPARATOR
+from recipe.serializers import RecipeDetailSerializer
+
+EXPORT_CHUNK_SIZE = 2000
+CSV_EXCLUDED_FIELDS = {"image_renditions"}
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Echo:
+    """File-like object that hands written values straight back."""
+    def write(self, value):
+        return value
+
+
+def serialize(recipes, context):
+    for recipe in recipes:
+        yield RecipeDetailSerializer(recipe, context=context).data
+
+
+def to_ndjson(rows):
+    encoder = JSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + "\n"
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(item["name"] for item in value)
+    return "" if value is None else value
+
+
+def to_csv(rows):
+    """Render rows in the same layout ``importers.parse_csv`` reads."""
+    fields = [
+        field for field in RecipeDetailSerializer.Meta.fields
+        if field not in CSV_EXCLUDED_FIELDS
+    ]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in fields])
+
+
+def render(rows, export_format):
+    if export_format == "csv":
+        return to_csv(rows)
+    return to_ndjson(rows)
+
+
+async def aiterate(content, chunk_size=EXPORT_CHUNK_SIZE):
+    """Async iterator over rendered ``content``, for ASGI responses.
+
+    Django reads a sync streaming iterator under ASGI with one
+    ``sync_to_async(list)``, buffering the whole export. This pulls
+    ``chunk_size`` rendered rows at a time in the request's sync thread,
+    which owns the database cursor, so only one chunk is held.
+    """
+    next_chunk = sync_to_async(lambda: "".join(islice(content, chunk_size)))
+    while chunk := await next_chunk():
+        yield chunk
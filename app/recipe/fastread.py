@@ -0,0 +1,268 @@
+"""Serializer-free read path for recipe list and retrieve.
+
+``ReadPlan.compile()`` walks a (possibly pruned) model serializer once
+and turns every field into a column to select and a converter, so rows
+come straight from ``values()`` and each nested relation from a single
+``values_list()``. Plain ints and strings are passed through, aware
+datetimes take an inlined copy of DRF's ISO 8601 formatting, and every
+other field is converted by its own ``to_representation``, so output
+matches the serializer exactly. Anything the plan does not understand
+makes ``compile()`` return None, and the view uses the serializer.
+"""
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation is a no-op on what the database returns.
+PASSTHROUGH_FIELDS = {
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.SlugField,
+    serializers.FloatField,
+    serializers.BooleanField,
+}
+RELATION = object()
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _file_converter(field, model_field, context):
+    if not getattr(field, "use_url", True):
+        return lambda name: name or None
+    storage = model_field.storage
+    request = context.get("request")
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+    return convert
+
+
+def _datetime_converter(field):
+    """``DateTimeField.to_representation`` for aware values, inlined."""
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    tz = getattr(field, "timezone", None) or field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or tz is None:
+        return field.to_representation
+    slow = field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return slow(value)
+        try:
+            value = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return slow(value)
+        if value.endswith("+00:00"):
+            return value[:-6] + "Z"
+        return value
+    return convert
+
+
+def _converter(field, model, context):
+    if field.source in ("*", "") or "." in field.source:
+        raise Unsupported(field.field_name)
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    if type(field) is serializers.DateTimeField:
+        return _datetime_converter(field)
+    if isinstance(field, serializers.FileField):
+        model_field = model._meta.get_field(field.source)
+        return _file_converter(field, model_field, context)
+    if isinstance(field, (serializers.Serializer, relations.RelatedField,
+                          relations.ManyRelatedField,
+                          serializers.SerializerMethodField)):
+        raise Unsupported(field.field_name)
+    return field.to_representation
+
+
+class Relation:
+    """One many-to-many field, fetched for a whole page in one query."""
+
+    def __init__(self, model, source, columns=None, steps=None):
+        m2m = model._meta.get_field(source)
+        if not m2m.many_to_many or m2m.auto_created:
+            raise Unsupported(source)
+        self.target = m2m.related_model
+        self.query_name = m2m.related_query_name()
+        self.columns = columns
+        self.steps = steps
+
+    def fetch(self, ids):
+        """Map each recipe id to its rendered items, in default order."""
+        return self._group(self._rows(ids))
+
+    async def afetch(self, ids):
+        return self._group([row async for row in self._rows(ids)])
+
+    def _rows(self, ids):
+        queryset = self.target._default_manager.filter(
+            **{f"{self.query_name}__in": ids}
+        )
+        if self.steps is None:
+            return queryset.values_list(self.query_name, "pk")
+        return queryset.values_list(self.query_name, *self.columns)
+
+    def _group(self, rows):
+        grouped = {}
+        if self.steps is None:
+            for owner, pk in rows:
+                grouped.setdefault(owner, []).append(pk)
+            return grouped
+
+        steps = self.steps
+        for row in rows:
+            item = {}
+            for key, index, convert in steps:
+                value = row[index]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[key] = value
+            grouped.setdefault(row[0], []).append(item)
+        return grouped
+
+
+class ReadPlan:
+    def __init__(self, pk, columns, steps, relations):
+        self.pk = pk
+        self.columns = columns
+        self.steps = steps
+        self.relations = relations
+
+    @classmethod
+    def compile(cls, serializer, queryset):
+        """Build a plan for ``serializer`` over ``queryset``, or None."""
+        try:
+            return cls._compile(serializer, queryset)
+        except Unsupported:
+            return None
+
+    @classmethod
+    def _compile(cls, serializer, queryset):
+        model = serializer.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        available = concrete | set(queryset.query.annotations)
+        context = serializer.context
+        pk = model._meta.pk.name
+        columns, steps, rels = [pk], [], []
+
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                rels.append(cls._nested(model, field))
+                steps.append((key, len(rels) - 1, RELATION))
+            elif isinstance(field, relations.ManyRelatedField):
+                child = field.child_relation
+                if (type(child) is not relations.PrimaryKeyRelatedField
+                        or child.pk_field is not None):
+                    raise Unsupported(key)
+                rels.append(Relation(model, field.source))
+                steps.append((key, len(rels) - 1, RELATION))
+            else:
+                if field.source not in available:
+                    raise Unsupported(key)
+                convert = _converter(field, model, context)
+                if field.source not in columns:
+                    columns.append(field.source)
+                steps.append((key, field.source, convert))
+        return cls(pk, columns, steps, rels)
+
+    @staticmethod
+    def _nested(model, field):
+        child = field.child
+        if not isinstance(child, serializers.ModelSerializer):
+            raise Unsupported(field.field_name)
+        target = child.Meta.model
+        concrete = {f.name for f in target._meta.concrete_fields}
+        columns, steps = [], []
+        for key, sub in child.fields.items():
+            if sub.write_only:
+                continue
+            if sub.source not in concrete:
+                raise Unsupported(f"{field.field_name}.{key}")
+            convert = _converter(sub, target, child.context)
+            if sub.source not in columns:
+                columns.append(sub.source)
+            steps.append((key, columns.index(sub.source) + 1, convert))
+        return Relation(model, field.source, columns, steps)
+
+    def rows(self, queryset):
+        """The queryset as plain dicts carrying every column the plan reads."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def render(self, rows):
+        rows = list(rows)
+        ids = [row[self.pk] for row in rows]
+        related = [rel.fetch(ids) for rel in self.relations] if ids else []
+        return self._assemble(rows, related)
+
+    async def arender(self, rows):
+        """``render`` for async views; ``rows`` must already be fetched."""
+        ids = [row[self.pk] for row in rows]
+        related = (
+            [await rel.afetch(ids) for rel in self.relations] if ids else []
+        )
+        return self._assemble(rows, related)
+
+    def _assemble(self, rows, related):
+        steps = self.steps
+        data = []
+        for row in rows:
+            pk = row[self.pk]
+            item = {}
+            for key, source, convert in steps:
+                if convert is RELATION:
+                    item[key] = related[source].get(pk) or []
+                    continue
+                value = row[source]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[key] = value
+            data.append(item)
+        return data
+
+
+class FastReadMixin:
+    """Serve read actions from a ``ReadPlan`` when the serializer allows.
+
+    Permissions are only checked at the request level here, so a view
+    with object-level permissions should drop ``retrieve`` from
+    ``fast_read_actions``.
+    """
+    fast_read_actions = {"list", "retrieve"}
+
+    def get_read_plan(self, queryset):
+        if self.action not in self.fast_read_actions:
+            return None
+        return ReadPlan.compile(self.get_serializer(), queryset)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_read_plan(queryset)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = plan.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_read_plan(queryset)
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            plan.rows(queryset),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        return Response(plan.render([row])[0])
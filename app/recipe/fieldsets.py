@@ -0,0 +1,127 @@
+"""Sparse fieldsets: ``?fields=`` and ``?expand=`` on read endpoints.
+
+``fields`` is a comma separated whitelist of top-level fields, and
+``relation.field`` picks fields of a nested object. Once either
+parameter is given, nested relations are returned as lists of ids
+unless they are named in ``expand`` (or picked into with a dotted
+field). Without them, responses are unchanged.
+
+The same selection tells the view which columns and relations to load,
+so nothing the client did not ask for is read from the database.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def _split(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _is_nested(field):
+    return isinstance(field, serializers.ListSerializer)
+
+
+def model_columns(serializer):
+    """Concrete model fields behind a (possibly pruned) model serializer."""
+    opts = serializer.Meta.model._meta
+    concrete = {field.name for field in opts.concrete_fields}
+    columns = [opts.pk.name]
+    for field in serializer.fields.values():
+        if field.source in concrete and field.source not in columns:
+            columns.append(field.source)
+    return columns
+
+
+class FieldSelection:
+    def __init__(self, fields=None, expand=()):
+        self.fields = None
+        self.nested = {}
+        if fields is not None:
+            self.fields = set()
+            for name in fields:
+                name, _, sub = name.partition(".")
+                self.fields.add(name)
+                if sub:
+                    self.nested.setdefault(name, set()).add(sub)
+        self.expand = set(expand) | set(self.nested)
+
+    @classmethod
+    def from_request(cls, request, serializer):
+        """Parse the query string, or return None if it selects nothing.
+
+        Names are checked against ``serializer``; unknown ones are a 400.
+        """
+        params = request.query_params
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return None
+        fields = params.get(FIELDS_PARAM)
+        selection = cls(
+            None if fields is None else _split(fields),
+            _split(params.get(EXPAND_PARAM, "")),
+        )
+        selection.validate(serializer.fields)
+        return selection
+
+    def validate(self, available):
+        errors = {}
+        unknown = sorted((self.fields or set()) - set(available))
+        for name, subs in sorted(self.nested.items()):
+            field = available.get(name)
+            if field is None:
+                continue
+            if not _is_nested(field):
+                unknown.append(name)
+                continue
+            unknown += [
+                f"{name}.{sub}"
+                for sub in sorted(subs - set(field.child.fields))
+            ]
+        if unknown:
+            errors[FIELDS_PARAM] = [f"Unknown field {name!r}." for name in unknown]
+
+        not_nested = sorted(
+            name for name in self.expand - set(self.nested)
+            if not _is_nested(available.get(name))
+        )
+        if not_nested:
+            errors[EXPAND_PARAM] = [
+                f"Cannot expand {name!r}." for name in not_nested
+            ]
+        if errors:
+            raise ValidationError(errors)
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def prune(self, fields):
+        """Drop, collapse or trim a serializer's ``fields`` in place."""
+        for name in list(fields):
+            field = fields[name]
+            if not self.includes(name):
+                del fields[name]
+            elif not _is_nested(field):
+                continue
+            elif name not in self.expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    many=True, read_only=True, source=field.source
+                )
+            elif name in self.nested:
+                child_fields = field.child.fields
+                for sub in list(child_fields):
+                    if sub not in self.nested[name]:
+                        child_fields.pop(sub)
+        return fields
+
+
+class SparseFieldsMixin:
+    """Prune fields by the ``field_selection`` in the serializer context."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.context.get("field_selection")
+        if selection is not None:
+            selection.prune(fields)
+        return fields
@@ -0,0 +1,166 @@
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.models import ImageJob, LibraryVersion, Recipe
+
+RENDITIONS = {
+    "thumb": 150,
+    "medium": 600,
+    "large": 1200,
+}
+FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+QUALITY = 82
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=10)
+
+
+def rendition_path(image_name, rendition, ext):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return os.path.join(
+        "uploads", "recipe", "renditions", f"{stem}-{rendition}.{ext}"
+    )
+
+
+def render(image_file):
+    """Decode, auto-orient and resize an image into every rendition.
+
+    Returns ``{rendition: {ext: bytes}}``. EXIF is dropped because the
+    encoders are never handed the original metadata.
+    """
+    with Image.open(image_file) as original:
+        oriented = ImageOps.exif_transpose(original).convert("RGB")
+
+    rendered = {}
+    for name, size in RENDITIONS.items():
+        resized = oriented.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        rendered[name] = {}
+        for ext, pil_format in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=QUALITY)
+            rendered[name][ext] = buffer.getvalue()
+    return rendered
+
+
+def rendition_paths(renditions):
+    """Every stored path in an ``image_renditions`` mapping."""
+    return {
+        path for formats in renditions.values() for path in formats.values()
+    }
+
+
+def delete_renditions(renditions, keep=()):
+    """Delete rendition files once the current transaction commits.
+
+    Paths in ``keep`` are still referenced and stay.
+    """
+    paths = rendition_paths(renditions) - set(keep)
+    if not paths:
+        return
+    storage = Recipe._meta.get_field("image").storage
+
+    def delete():
+        for path in paths:
+            storage.delete(path)
+
+    transaction.on_commit(delete)
+
+
+def enqueue(recipe):
+    return ImageJob.objects.create(recipe=recipe, image=recipe.image.name)
+
+
+def process(job):
+    recipe = job.recipe
+    if recipe.image.name != job.image:
+        return  # Superseded by a newer upload with its own job.
+
+    with recipe.image.open("rb") as image_file:
+        rendered = render(image_file)
+
+    storage = recipe.image.storage
+    renditions = {}
+    for name, formats in rendered.items():
+        for ext, data in formats.items():
+            path = rendition_path(job.image, name, ext)
+            storage.delete(path)
+            renditions.setdefault(name, {})[ext] = storage.save(
+                path, ContentFile(data)
+            )
+
+    with transaction.atomic():
+        previous = Recipe.objects.select_for_update().filter(
+            pk=recipe.pk, image=job.image
+        ).values_list("image_renditions", flat=True).first()
+        if previous is None:
+            # Replaced or deleted while rendering: nothing refers to these.
+            delete_renditions(renditions)
+            return
+        Recipe.objects.filter(pk=recipe.pk).update(
+            image_renditions=renditions,
+            updated_at=timezone.now(),
+        )
+        LibraryVersion.bump(recipe.user_id)
+        delete_renditions(previous, keep=rendition_paths(renditions))
+
+
+def claim_next(after_id=0):
+    with transaction.atomic():
+        job = (
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .select_related("recipe")
+            .filter(status=ImageJob.Status.PENDING, id__gt=after_id)
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ImageJob.Status.RUNNING
+        job.attempts += 1
+        job.save(update_fields=["status", "attempts", "updated_at"])
+    return job
+
+
+def run(job):
+    try:
+        process(job)
+    except Exception as exc:
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.status = (
+            ImageJob.Status.FAILED
+            if job.attempts >= MAX_ATTEMPTS
+            else ImageJob.Status.PENDING
+        )
+    else:
+        job.error = ""
+        job.status = ImageJob.Status.DONE
+    job.save(update_fields=["status", "error", "updated_at"])
+    return job
+
+
+def requeue_stale():
+    """Put jobs left running by a crashed worker back in the queue."""
+    return ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING,
+        updated_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status=ImageJob.Status.PENDING)
+
+
+def run_pending(limit=None):
+    """Make one pass over the queue; failed jobs retry on the next pass."""
+    processed, last_id = 0, 0
+    while limit is None or processed < limit:
+        job = claim_next(after_id=last_id)
+        if job is None:
+            break
+        run(job)
+        processed, last_id = processed + 1, job.id
+    return processed
@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """Keyset pagination on ``-id`` that only kicks in when asked for.
+
+    Clients opt in by sending ``page_size`` or ``cursor``; plain list
+    requests keep returning the full, unpaginated array. Views with a
+    ``get_ordering()`` method choose their own keyset ordering.
+    """
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def is_requested(self, request):
+        params = request.query_params
+        return (
+            self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def get_page_size(self, request):
+        # DRF's paginate_queryset skips pagination on a falsy page size.
+        if not self.is_requested(request):
+            return None
+        return super().get_page_size(request)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(
+            queryset, request, view
+        )
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, "get_ordering"):
+            return view.get_ordering()
+        return super().get_ordering(request, queryset, view)
@@ -1,6 +1,23 @@
 from rest_framework import serializers
 
 from core.models import Recipe, Tag, Ingredient
+from recipe.fieldsets import SparseFieldsMixin
+
+
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """Turn stored rendition paths into URLs, like ``ImageField`` does."""
+    def to_representation(self, value):
+        storage = Recipe._meta.get_field("image").storage
+        request = self.context.get("request")
+        urls = {}
+        for name, formats in value.items():
+            urls[name] = {}
+            for ext, path in formats.items():
+                url = storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[name][ext] = url
+        return urls
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -28,9 +45,24 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "slug", "created_at", "updated_at"]
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class IngredientDetailSerializer(IngredientSerializer):
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ["recipe_count"]
+        read_only_fields = (
+            IngredientSerializer.Meta.read_only_fields + ["recipe_count"]
+        )
+
+
+class TagDetailSerializer(TagSerializer):
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ["recipe_count"]
+        read_only_fields = TagSerializer.Meta.read_only_fields + ["recipe_count"]
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
@@ -43,28 +75,32 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients",
             "tags",
             "image",
+            "image_renditions",
             "link",
         ]
         read_only_fields = ["id", "slug"]
 
+    def _set_nested(self, recipe, field, items, replace=False):
+        model = recipe._meta.get_field(field).related_model
+        names = [item["name"] for item in items]
+        by_name = model.objects.get_or_create_many(
+            self.context["request"].user,
+            names,
+        )
+        objs = [by_name[name] for name in dict.fromkeys(names)]
+        if replace:
+            getattr(recipe, field).set(objs)
+        else:
+            getattr(recipe, field).add(*objs)
+
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
         ingredients = validated_data.pop("ingredients", [])
         recipe = Recipe.objects.create(**validated_data)
-        auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
-            )
-            recipe.tags.add(tag_obj)
-
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient
-            )
-            recipe.ingredients.add(ingredient_obj)
+        if tags:
+            self._set_nested(recipe, "tags", tags)
+        if ingredients:
+            self._set_nested(recipe, "ingredients", ingredients)
 
         return recipe
 
@@ -74,26 +110,11 @@ class RecipeSerializer(serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
 
         if tags is not None:
-            auth_user = self.context["request"].user
-            instance.tags.clear()
-
-            for tag in tags:
-                tag_obj, _ = Tag.objects.get_or_create(
-                    user=auth_user,
-                    **tag
-                )
-                instance.tags.add(tag_obj)
-
+            self._set_nested(instance, "tags", tags, replace=True)
         if ingredients is not None:
-            auth_user = self.context["request"].user
-            instance.ingredients.clear()
-
-            for ingredient in ingredients:
-                ingredient_obj, _ = Ingredient.objects.get_or_create(
-                    user=auth_user,
-                    **ingredient
-                )
-                instance.ingredients.add(ingredient_obj)
+            self._set_nested(
+                instance, "ingredients", ingredients, replace=True
+            )
 
         return instance
 
@@ -103,6 +124,14 @@ class RecipeSerializer(serializers.ModelSerializer):
         return value
 
 
+class RecipeSearchSerializer(RecipeSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ["rank", "headline"]
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + [
@@ -114,8 +143,18 @@ class RecipeDetailSerializer(RecipeSerializer):
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = Recipe
-        fields = ["id", "image"]
+        fields = ["id", "image", "image_renditions"]
         read_only_fileds = ["id"]
         extra_kwargs = {"image": {"required": True}}
+
+
+class RecipeBulkImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=["jsonl", "csv"],
+        required=False,
+    )
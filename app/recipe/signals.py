@@ -0,0 +1,190 @@
+import weakref
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Ingredient, LibraryVersion, Recipe, Tag, Tombstone
+from recipe import images
+
+LIBRARY_MODELS = (Recipe, Tag, Ingredient)
+M2M_ACTIONS = {"post_add", "post_remove", "post_clear"}
+RECIPE_LINKS = {Tag: "tags", Ingredient: "ingredients"}
+COUNTED_LINKS = {
+    Recipe.tags.through: Recipe._meta.get_field("tags"),
+    Recipe.ingredients.through: Recipe._meta.get_field("ingredients"),
+}
+# QuerySet being deleted -> pks whose bookkeeping was already done for
+# the whole batch and whose post_delete has not been seen yet.
+_batches = weakref.WeakKeyDictionary()
+
+
+def _deleting_users(origin):
+    user_model = get_user_model()
+    if isinstance(origin, QuerySet):
+        return origin.model is user_model
+    return isinstance(origin, user_model)
+
+
+def _in_batch(sender, instance, origin):
+    """Whether ``instance`` goes in a ``QuerySet.delete()`` of ``sender``.
+
+    The collector sends per-row signals for such a delete, with the
+    queryset as ``origin``. The first ``pre_delete`` does the work for
+    every row the queryset matches, so the other rows can skip it.
+    """
+    if not isinstance(origin, QuerySet) or origin.model is not sender:
+        return False
+    pending = _batches.get(origin)
+    if pending is None or instance.pk not in pending:
+        rows = list(origin.values_list("pk", "user_id"))
+        _batches[origin] = {pk for pk, _ in rows}
+        library_batch_deleted(sender, rows)
+    return True
+
+
+def library_batch_deleted(sender, rows):
+    """Per-row delete bookkeeping for ``[(pk, user_id)]`` in a few queries."""
+    Tombstone.objects.bulk_create([
+        Tombstone(
+            user_id=user_id, kind=sender._meta.model_name, object_id=pk
+        )
+        for pk, user_id in rows
+    ])
+    for user_id in {user_id for _, user_id in rows}:
+        LibraryVersion.bump(user_id)
+    pks = [pk for pk, _ in rows]
+    if sender is Recipe:
+        uncount_recipes(pks)
+    else:
+        touch_recipes(**{f"{RECIPE_LINKS[sender]}__in": pks})
+
+
+def _batch_row_deleted(sender, instance, origin):
+    """Whether a ``post_delete`` row was handled by ``_in_batch``."""
+    pending = _batches.get(origin) if isinstance(origin, QuerySet) else None
+    if pending is None or instance.pk not in pending:
+        return False
+    pending.discard(instance.pk)
+    return True
+
+
+def library_changed(sender, instance, **kwargs):
+    LibraryVersion.bump(instance.user_id)
+
+
+def library_row_deleted(sender, instance, origin=None, **kwargs):
+    # Rows cascading from a deleted user have no library left to version.
+    if _deleting_users(origin) or _batch_row_deleted(sender, instance, origin):
+        return
+    LibraryVersion.bump(instance.user_id)
+    Tombstone.objects.create(
+        user_id=instance.user_id,
+        kind=sender._meta.model_name,
+        object_id=instance.pk,
+    )
+
+
+for model in LIBRARY_MODELS:
+    post_save.connect(library_changed, sender=model)
+    post_delete.connect(library_row_deleted, sender=model)
+
+
+def touch_recipes(**lookup):
+    """Bump ``updated_at`` on recipes whose nested tags/ingredients changed.
+
+    Delta sync finds changed recipes by ``updated_at``, and link or
+    name changes do not save the recipe row itself.
+    """
+    Recipe.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def library_links_changed(sender, instance, action, **kwargs):
+    if action in M2M_ACTIONS:
+        LibraryVersion.bump(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_counts_changed(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action not in {"post_add", "pre_remove", "pre_clear"}:
+        return
+    field = COUNTED_LINKS[sender]
+    recipe_col, target_col = field.m2m_column_name(), field.m2m_reverse_name()
+    if reverse:
+        recipe_col, target_col = target_col, recipe_col
+
+    if action == "post_add":
+        # Django only reports the links it actually inserted.
+        ids, sign = list(pk_set), 1
+    else:
+        # Removals report every id asked for, linked or not, so look at
+        # the rows about to go (we are inside the same transaction).
+        links = sender.objects.filter(**{recipe_col: instance.pk})
+        if pk_set is not None:
+            links = links.filter(**{f"{target_col}__in": pk_set})
+        ids, sign = list(links.values_list(target_col, flat=True)), -1
+
+    if reverse:
+        type(instance).objects.add_recipe_counts({instance.pk: sign * len(ids)})
+        if ids:
+            touch_recipes(pk__in=ids)
+    else:
+        model.objects.add_recipe_counts({pk: sign for pk in ids})
+        if ids:
+            touch_recipes(pk=instance.pk)
+
+
+def uncount_recipes(recipe_ids):
+    """Take recipes about to be deleted off their links' recipe counts.
+
+    One grouped query and one UPDATE per relation, however many recipes.
+    """
+    for field in COUNTED_LINKS.values():
+        target = field.m2m_reverse_name()
+        counts = field.remote_field.through.objects.filter(
+            **{f"{field.m2m_column_name()}__in": recipe_ids}
+        ).values(target).annotate(n=Count("pk")).values_list(target, "n")
+        field.related_model.objects.add_recipe_counts(
+            {pk: -n for pk, n in counts}
+        )
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleted(sender, instance, origin=None, **kwargs):
+    # The collector drops through rows without m2m_changed.
+    if _deleting_users(origin) or _in_batch(sender, instance, origin):
+        return
+    uncount_recipes([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_files_deleted(sender, instance, **kwargs):
+    # Also for deleted users: nothing else removes the files.
+    images.delete_renditions(instance.image_renditions)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def linked_item_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        touch_recipes(**{RECIPE_LINKS[sender]: instance.pk})
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def linked_item_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_users(origin) or _in_batch(sender, instance, origin):
+        return
+    touch_recipes(**{RECIPE_LINKS[sender]: instance.pk})
@@ -0,0 +1,214 @@
+"""Per-user inverted index over recipe tags and ingredients.
+
+``SimilarityIndex`` holds one user's (recipe, feature) links as NumPy
+arrays sorted by feature, where a feature is a tag or an ingredient.
+Finding the recipes most like one recipe reads the postings of that
+recipe's features, counts hits per recipe with ``bincount`` and scores
+the counts as Jaccard or cosine similarity. That takes a few
+milliseconds for a library of 100k recipes, with no SQL beyond the
+version check.
+
+Indexes are cached per process and stamped with the user's
+``LibraryVersion``. When the version moves on, the index is brought up
+to date from the same data delta sync uses: recipes whose
+``updated_at`` is recent, which the ``m2m_changed`` receivers bump on
+every link change, and recipe tombstones. Only those recipes' links
+are read again. Because the index only ever changes from committed
+rows, every worker process sees the same index and a rolled back write
+leaves nothing behind. A full rebuild happens on first use, and when
+the index is older than the tombstone history.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import LibraryVersion, Recipe, Tombstone
+from recipe import sync
+
+JACCARD = "jaccard"
+COSINE = "cosine"
+METRICS = [JACCARD, COSINE]
+DEFAULTS = {
+    "MAX_LIBRARIES": 32,
+    "DEFAULT_RESULTS": 10,
+    "MAX_RESULTS": 50,
+}
+LINKS = (
+    # (through model, target column, feature offset)
+    (Recipe.tags.through, "tag_id", 0),
+    (Recipe.ingredients.through, "ingredient_id", 1),
+)
+
+
+def conf():
+    return {**DEFAULTS, **getattr(settings, "RECIPE_SIMILARITY", {})}
+
+
+def _load_links(**recipe_filter):
+    """``(recipe ids, feature keys)`` arrays for the matching recipes.
+
+    Tag ``t`` is feature ``2t`` and ingredient ``i`` is ``2i + 1``.
+    """
+    recipe_ids, features = [], []
+    for through, column, offset in LINKS:
+        rows = through.objects.filter(
+            **{f"recipe__{key}": value for key, value in recipe_filter.items()}
+        ).values_list("recipe_id", column)
+        pairs = np.array(list(rows), dtype=np.int64).reshape(-1, 2)
+        recipe_ids.append(pairs[:, 0])
+        features.append(pairs[:, 1] * 2 + offset)
+    return np.concatenate(recipe_ids), np.concatenate(features)
+
+
+class SimilarityIndex:
+    """One user's recipe features, immutable once built."""
+
+    def __init__(self, ids, recipe_ids, features, version, synced_at):
+        # ``ids`` is sorted; a recipe's row is its position in it.
+        self.ids = ids
+        order = np.argsort(features, kind="stable")
+        self.features = features[order]
+        self.rows = np.searchsorted(ids, recipe_ids[order])
+        self.sizes = np.bincount(self.rows, minlength=len(ids))
+        self.version = version
+        self.synced_at = synced_at
+
+    @classmethod
+    def build(cls, user_id, version):
+        synced_at = timezone.now()
+        ids = np.array(
+            Recipe.objects.filter(user_id=user_id).order_by("id").values_list(
+                "id", flat=True
+            ),
+            dtype=np.int64,
+        )
+        recipe_ids, features = _load_links(user_id=user_id)
+        return cls(ids, recipe_ids, features, version, synced_at)
+
+    def refresh(self, user_id, version):
+        """A copy brought up to date, rereading only what changed."""
+        options = sync.conf()
+        now = timezone.now()
+        retention = timedelta(days=options["TOMBSTONE_RETENTION_DAYS"])
+        if self.synced_at < now - retention:
+            return self.build(user_id, version)
+        since = self.synced_at - timedelta(seconds=options["OVERLAP_SECONDS"])
+
+        changed = np.array(
+            Recipe.objects.filter(
+                user_id=user_id, updated_at__gte=since
+            ).values_list("id", flat=True),
+            dtype=np.int64,
+        )
+        deleted = np.array(
+            Tombstone.objects.filter(
+                user_id=user_id,
+                kind=Recipe._meta.model_name,
+                deleted_at__gte=since,
+            ).values_list("object_id", flat=True),
+            dtype=np.int64,
+        )
+        new_ids, new_features = _load_links(id__in=changed.tolist())
+
+        old_ids = self.ids[self.rows]
+        keep = ~np.isin(old_ids, np.concatenate([changed, deleted]))
+        ids = np.union1d(np.setdiff1d(self.ids, deleted), changed)
+        if np.array_equal(ids, self.ids) and self._same_links(
+            old_ids[~keep], self.features[~keep], new_ids, new_features
+        ):
+            # Edits that left every link alone, such as a new title.
+            unchanged = copy.copy(self)
+            unchanged.version, unchanged.synced_at = version, now
+            return unchanged
+        return type(self)(
+            ids,
+            np.concatenate([old_ids[keep], new_ids]),
+            np.concatenate([self.features[keep], new_features]),
+            version,
+            now,
+        )
+
+    @staticmethod
+    def _same_links(old_ids, old_features, new_ids, new_features):
+        return len(old_ids) == len(new_ids) and np.array_equal(
+            np.sort(old_ids * 2**32 + old_features),
+            np.sort(new_ids * 2**32 + new_features),
+        )
+
+    def __contains__(self, recipe_id):
+        row = np.searchsorted(self.ids, recipe_id)
+        return row < len(self.ids) and self.ids[row] == recipe_id
+
+    def similar(self, recipe_id, limit, metric=JACCARD):
+        """``[(recipe id, score)]``, best first, for recipes sharing a feature.
+
+        Ties go to the newer recipe.
+        """
+        target = np.searchsorted(self.ids, recipe_id)
+        wanted = self.features[self.rows == target]
+        if not len(wanted):
+            return []
+        starts = np.searchsorted(self.features, wanted, side="left")
+        ends = np.searchsorted(self.features, wanted, side="right")
+        hits = np.concatenate([
+            self.rows[start:end] for start, end in zip(starts, ends)
+        ])
+        shared = np.bincount(hits, minlength=len(self.ids))
+        shared[target] = 0
+        candidates = np.flatnonzero(shared)
+        if not len(candidates):
+            return []
+
+        overlap = shared[candidates].astype(np.float64)
+        sizes = self.sizes[candidates]
+        if metric == COSINE:
+            scores = overlap / np.sqrt(sizes * len(wanted))
+        else:
+            scores = overlap / (sizes + len(wanted) - overlap)
+
+        if len(candidates) > limit:
+            # The limit-th best score, then everything at least that good,
+            # so ties at the cut are decided by id below.
+            cut = np.partition(scores, len(scores) - limit)[-limit]
+            best = scores >= cut
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((-self.ids[candidates], -scores))[:limit]
+        return [
+            (int(self.ids[candidates[i]]), float(scores[i])) for i in order
+        ]
+
+
+class SimilarityIndexCache:
+    """Per-process, least recently used ``SimilarityIndex`` per user."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        version = LibraryVersion.current(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+        if index is None:
+            index = SimilarityIndex.build(user_id, version)
+        elif index.version != version:
+            index = index.refresh(user_id, version)
+        with self._lock:
+            self._indexes[user_id] = index
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+indexes = SimilarityIndexCache(conf()["MAX_LIBRARIES"])
@@ -0,0 +1,195 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.fastread import FastReadMixin
+from recipe.views import IngredientViewSets, RecipeViewSets, TagViewSets
+from user.authentication import token_cache
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+LIST_ACTIONS = {"get": "list", "post": "create"}
+DETAIL_ACTIONS = {
+    "get": "retrieve",
+    "put": "update",
+    "patch": "partial_update",
+    "delete": "destroy",
+}
+
+
+def async_view(viewset, actions):
+    with override_settings(ASYNC_API_VIEWS=True):
+        return viewset.as_view(actions)
+
+
+class AsyncReadViewTests(TestCase):
+    """Async list/retrieve views must answer exactly like the sync ones."""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = f"Token {self.token.key}"
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth)
+        self.factory = APIRequestFactory()
+
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ("Dinner", "Vegan")
+        ]
+        basil = Ingredient.objects.create(user=self.user, name="Basil")
+        self.curry = Recipe.objects.create(
+            user=self.user,
+            title="Thai green curry",
+            description="A fragrant coconut curry with basil.",
+            time_minutes=30,
+            price=Decimal("7.50"),
+        )
+        self.curry.tags.add(*tags)
+        self.curry.ingredients.add(basil)
+        soup = Recipe.objects.create(
+            user=self.user,
+            title="Coconut soup",
+            time_minutes=15,
+            price=Decimal("4.00"),
+        )
+        soup.tags.add(tags[1])
+
+    def sync_get(self, url, params=None):
+        cache.clear()
+        return self.client.get(url, params)
+
+    async def async_get(self, view, url, params=None, auth=None, **kwargs):
+        await cache.aclear()
+        request = self.factory.get(
+            url, params, HTTP_AUTHORIZATION=auth or self.auth
+        )
+        response = await view(request, **kwargs)
+        return response.render()
+
+    async def assertSameOutput(self, view, url, params=None, **kwargs):
+        expected = await sync_to_async(self.sync_get)(url, params)
+        no_sync = AssertionError("fell back to the sync view")
+        with mock.patch.object(FastReadMixin, "list", side_effect=no_sync), \
+                mock.patch.object(
+                    FastReadMixin, "retrieve", side_effect=no_sync):
+            res = await self.async_get(view, url, params, **kwargs)
+        self.assertEqual(res.status_code, expected.status_code)
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(res["ETag"], expected["ETag"])
+
+    def test_flag_off_keeps_sync_views(self):
+        with override_settings(ASYNC_API_VIEWS=False):
+            view = RecipeViewSets.as_view(LIST_ACTIONS)
+
+        self.assertFalse(iscoroutinefunction(view))
+
+    def test_only_read_routes_are_async(self):
+        view = async_view(RecipeViewSets, LIST_ACTIONS)
+        upload = async_view(RecipeViewSets, {"post": "upload_image"})
+
+        self.assertTrue(iscoroutinefunction(view))
+        self.assertIs(view.cls, RecipeViewSets)
+        self.assertEqual(view.actions, LIST_ACTIONS)
+        self.assertTrue(view.csrf_exempt)
+        self.assertFalse(iscoroutinefunction(upload))
+
+    async def test_recipe_list_and_detail_match_sync(self):
+        view = async_view(RecipeViewSets, LIST_ACTIONS)
+        detail = async_view(RecipeViewSets, DETAIL_ACTIONS)
+        detail_url = reverse('recipe:recipe-detail', args=[self.curry.id])
+
+        await self.assertSameOutput(view, RECIPES_URL)
+        await self.assertSameOutput(view, RECIPES_URL, {"page_size": 1})
+        await self.assertSameOutput(
+            view, RECIPES_URL, {"fields": "id,title,tags", "expand": "tags"}
+        )
+        await self.assertSameOutput(detail, detail_url, pk=self.curry.id)
+
+    async def test_tag_and_ingredient_lists_match_sync(self):
+        tags = async_view(TagViewSets, LIST_ACTIONS)
+        ingredients = async_view(IngredientViewSets, LIST_ACTIONS)
+
+        await self.assertSameOutput(tags, TAGS_URL, {"ordering": "popular"})
+        await self.assertSameOutput(tags, TAGS_URL, {"page_size": 1})
+        await self.assertSameOutput(ingredients, INGREDIENTS_URL)
+
+    async def test_errors_match_sync(self):
+        view = async_view(RecipeViewSets, LIST_ACTIONS)
+        detail = async_view(RecipeViewSets, DETAIL_ACTIONS)
+
+        res = await self.async_get(view, RECIPES_URL, auth="Token nope")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+        res = await self.async_get(
+            view, RECIPES_URL, {"tags": "1", "tags_match": "some"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = await self.async_get(detail, "/", pk=0)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = await self.async_get(detail, "/", pk="abc")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_delta_sync_runs_the_sync_handler(self):
+        view = async_view(RecipeViewSets, LIST_ACTIONS)
+        since = (timezone.now() - timedelta(hours=1)).isoformat()
+        expected = await sync_to_async(self.sync_get)(
+            RECIPES_URL, {"since": since}
+        )
+
+        res = await self.async_get(view, RECIPES_URL, {"since": since})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        changed = json.loads(res.content)["changed"]
+        self.assertEqual(changed, expected.json()["changed"])
+        self.assertEqual(len(changed), 2)
+
+    async def test_conditional_get_is_answered_from_version(self):
+        view = async_view(RecipeViewSets, LIST_ACTIONS)
+        res = await self.async_get(view, RECIPES_URL)
+
+        request = self.factory.get(
+            RECIPES_URL,
+            HTTP_AUTHORIZATION=self.auth,
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+        res = await view(request)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_writes_run_the_sync_view(self):
+        view = async_view(TagViewSets, LIST_ACTIONS)
+        request = self.factory.post(
+            TAGS_URL, {"name": "Quick"}, format="json",
+            HTTP_AUTHORIZATION=self.auth,
+        )
+
+        res = await view(request)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            await Tag.objects.filter(user=self.user, name="Quick").aexists()
+        )
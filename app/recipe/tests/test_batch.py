@@ -0,0 +1,170 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe.serializers import RecipeDetailSerializer
+from recipe.views import MAX_BATCH_SIZE
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+BATCH_URL = reverse('recipe:recipe-batch')
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "description": "Sample description",
+        "time_minutes": 10,
+        "price": Decimal("5.00"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class BatchRetrieveTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_returns_detail_representation_of_requested_ids(self):
+        first = create_recipe(self.user, title="First")
+        second = create_recipe(self.user, title="Second")
+        create_recipe(self.user, title="Not asked for")
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        foreign = create_recipe(other)
+
+        res = self.client.get(
+            RECIPES_URL, {"ids": f"{first.id},{second.id},{foreign.id},0"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = RecipeDetailSerializer(
+            Recipe.objects.filter(pk__in=[first.id, second.id]), many=True
+        ).data
+        self.assertEqual(res.json(), expected)
+
+    def test_query_count_is_independent_of_batch_size(self):
+        recipes = []
+        for i in range(12):
+            recipe = create_recipe(self.user, title=f"Recipe {i}")
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f"T{i}"))
+            recipes.append(recipe)
+
+        def fetch(batch):
+            ids = ",".join(str(recipe.id) for recipe in batch)
+            return self.client.get(RECIPES_URL, {"ids": ids})
+
+        with self.assertNumQueries(4):
+            fetch(recipes[:2])
+        with self.assertNumQueries(4):
+            res = fetch(recipes)
+
+        self.assertEqual(len(res.json()), 12)
+
+    def test_invalid_ids_are_rejected(self):
+        too_many = ",".join(str(n) for n in range(MAX_BATCH_SIZE + 1))
+
+        for ids in ("1,abc", ",", too_many):
+            res = self.client.get(RECIPES_URL, {"ids": ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("ids", res.json())
+
+
+class BatchMutateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.first = create_recipe(self.user, title="First")
+        self.second = create_recipe(self.user, title="Second")
+
+    def test_patch_updates_every_item(self):
+        res = self.client.patch(BATCH_URL, [
+            {"id": self.first.id, "title": "First, renamed"},
+            {"id": self.second.id, "tags": [{"name": "Dinner"}]},
+        ], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()["results"]
+        self.assertEqual(
+            [(item["id"], item["status"]) for item in results],
+            [(self.first.id, 200), (self.second.id, 200)],
+        )
+        self.assertEqual(results[0]["data"]["title"], "First, renamed")
+        self.assertEqual(results[1]["data"]["tags"][0]["name"], "Dinner")
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.title, "First, renamed")
+        self.assertEqual(Tag.objects.get().recipe_count, 1)
+
+    def test_patch_is_all_or_nothing(self):
+        res = self.client.patch(BATCH_URL, [
+            {"id": self.first.id, "title": "Renamed"},
+            {"id": self.second.id, "time_minutes": 0},
+            {"id": 0, "title": "Missing"},
+        ], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        results = res.json()["results"]
+        self.assertEqual([item["status"] for item in results], [200, 400, 404])
+        self.assertIn("time_minutes", results[1]["errors"])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.title, "First")
+
+    def test_patch_cannot_touch_other_users_recipes(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        foreign = create_recipe(other, title="Theirs")
+
+        res = self.client.patch(
+            BATCH_URL, [{"id": foreign.id, "title": "Mine"}], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json()["results"][0]["status"], 404)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.title, "Theirs")
+
+    def test_patch_payload_must_be_a_list_of_items_with_ids(self):
+        for payload in (
+            {"id": self.first.id},
+            [],
+            [{"title": "No id"}],
+            [{"id": self.first.id}, {"id": self.first.id}],
+        ):
+            res = self.client.patch(BATCH_URL, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_reports_each_id(self):
+        res = self.client.delete(f"{BATCH_URL}?ids={self.first.id},0")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], [
+            {"id": self.first.id, "status": 204},
+            {"id": 0, "status": 404},
+        ])
+        self.assertEqual(
+            list(Recipe.objects.values_list("id", flat=True)),
+            [self.second.id],
+        )
+
+    def test_delete_requires_ids(self):
+        res = self.client.delete(BATCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Recipe.objects.filter(pk=self.first.id).exists())
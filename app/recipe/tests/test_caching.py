@@ -0,0 +1,189 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import LibraryVersion, Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def recipe_detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample Recipe Name",
+        "time_minutes": 22,
+        "price": Decimal("560.75"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def settle(user, seconds=2):
+    """Move the user's library version back by ``seconds``."""
+    version = LibraryVersion.current(user.pk) - timedelta(seconds=seconds)
+    LibraryVersion.objects.filter(user=user).update(updated_at=version)
+    return version
+
+
+class LibraryCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="pass1234")
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_list_sets_validators(self):
+        settle(self.user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+        self.assertIn("Authorization", res["Vary"])
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_if_modified_since_returns_not_modified(self):
+        settle(self.user)
+        last_modified = self.client.get(RECIPES_URL)["Last-Modified"]
+
+        res = self.client.get(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_last_modified_rounds_up_and_waits_for_the_second(self):
+        version = timezone.now().replace(microsecond=500000)
+        LibraryVersion.objects.filter(user=self.user).update(
+            updated_at=version
+        )
+
+        res = self.client.get(RECIPES_URL)
+        self.assertNotIn("Last-Modified", res)
+
+        version -= timedelta(seconds=5)
+        LibraryVersion.objects.filter(user=self.user).update(
+            updated_at=version
+        )
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(
+            res["Last-Modified"], http_date(int(version.timestamp()) + 1)
+        )
+
+    def test_write_in_the_same_second_is_not_hidden(self):
+        # The date a client could hold from earlier in the same second.
+        last_modified = http_date(int(timezone.now().timestamp()) + 1)
+        create_recipe(user=self.user, title="Same second")
+
+        res = self.client.get(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_if_none_match_ignores_if_modified_since(self):
+        settle(self.user)
+        first = self.client.get(RECIPES_URL)
+
+        res = self.client.get(
+            RECIPES_URL,
+            HTTP_IF_NONE_MATCH='"stale"',
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", res)
+
+    def test_repeat_get_is_served_from_cache(self):
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(first.data, second.data)
+
+    def test_detail_is_cached_per_path(self):
+        other = create_recipe(user=self.user, title="Other")
+
+        first = self.client.get(recipe_detail_url(self.recipe.id))
+        second = self.client.get(recipe_detail_url(other.id))
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertEqual(second.data["title"], "Other")
+
+    def test_write_invalidates(self):
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.client.patch(
+            recipe_detail_url(self.recipe.id), {"title": "Renamed"}
+        )
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["title"], "Renamed")
+
+    def test_tag_changes_invalidate_recipe_list(self):
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.assertNotEqual(self.client.get(RECIPES_URL)["ETag"], etag)
+
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.recipe.tags.add(tag)
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["tags"][0]["name"], "Dinner")
+
+    def test_other_users_writes_do_not_invalidate(self):
+        etag = self.client.get(TAGS_URL)["ETag"]
+        other = create_user(email="other@example.com", password="pass1234")
+        Tag.objects.create(user=other, name="Dinner")
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_recipe_is_not_cached(self):
+        res = self.client.get(recipe_detail_url(self.recipe.id + 1000))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
+
+    def test_deleting_user_removes_library(self):
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Dinner"))
+
+        self.user.delete()
+
+        self.assertFalse(LibraryVersion.objects.exists())
+
+    def test_bulk_deleting_users_removes_libraries(self):
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Dinner"))
+
+        get_user_model().objects.filter(pk=self.user.pk).delete()
+
+        self.assertFalse(LibraryVersion.objects.exists())
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.importers import RecipeImporter, parse_csv
+from recipe.serializers import RecipeDetailSerializer
+
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample Recipe Name",
+        "description": "Sample recipe description",
+        "time_minutes": 22,
+        "price": Decimal("560.75"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def read_stream(res):
+    return b"".join(res.streaming_content).decode()
+
+
+class RecipeExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="pass1234")
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user, title="Pasta")
+        self.recipe.tags.add(
+            Tag.objects.create(user=self.user, name="Dinner"),
+            Tag.objects.create(user=self.user, name="Italian"),
+        )
+        self.recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name="Flour"),
+        )
+        create_recipe(user=self.user, title="Soup")
+
+    def test_export_ndjson(self):
+        create_recipe(
+            user=create_user(email="other@example.com", password="pass1234")
+        )
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in read_stream(res).splitlines()]
+        self.assertEqual([r["title"] for r in rows], ["Soup", "Pasta"])
+        expected = RecipeDetailSerializer(self.recipe).data
+        self.assertEqual(rows[1]["slug"], expected["slug"])
+        self.assertEqual(rows[1]["price"], expected["price"])
+        self.assertEqual(
+            sorted(t["name"] for t in rows[1]["tags"]), ["Dinner", "Italian"]
+        )
+
+    def test_export_csv_round_trips_through_import(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        body = read_stream(res)
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(rows[1]["ingredients"], "Flour")
+        self.assertEqual(
+            sorted(rows[1]["tags"].split(";")), ["Dinner", "Italian"]
+        )
+
+        other = create_user(email="other@example.com", password="pass1234")
+        importer = RecipeImporter(other).run(
+            parse_csv(io.StringIO(body))
+        )
+        self.assertEqual(importer.summary, {"created": 2, "errors": []})
+
+    def test_export_respects_filters(self):
+        tag = self.recipe.tags.first()
+
+        res = self.client.get(EXPORT_URL, {"tags": str(tag.id)})
+
+        rows = read_stream(res).splitlines()
+        self.assertEqual(len(rows), 1)
+
+    def test_export_query_count_is_constant(self):
+        def queries():
+            with CaptureQueriesContext(connection) as ctx:
+                read_stream(self.client.get(EXPORT_URL))
+            return len(ctx.captured_queries)
+
+        baseline = queries()
+        for i in range(20):
+            create_recipe(user=self.user, title=f"Recipe {i}")
+
+        self.assertEqual(queries(), baseline)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        sync_body = await sync_to_async(lambda: read_stream(
+            self.client.get(EXPORT_URL, {"export_format": "csv"})
+        ))()
+        token = await Token.objects.acreate(user=self.user)
+
+        res = await self.async_client.get(
+            EXPORT_URL, {"export_format": "csv"},
+            headers={"Authorization": f"Token {token.key}"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        chunks = [chunk async for chunk in res.streaming_content]
+        self.assertEqual(b"".join(chunks).decode(), sync_body)
+
+    def test_unknown_format(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,150 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.serializers import SerializerMethodField
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import serializers
+from recipe.fastread import ReadPlan
+from recipe.views import RecipeViewSets
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class FastReadTests(TestCase):
+    """The values() read path must render exactly what serializers do."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ("Dinner", "Vegan", "Crème brûlée")
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ("Basil", "Coconut milk")
+        ]
+        self.curry = Recipe.objects.create(
+            user=self.user,
+            title="Thai green curry",
+            description="A fragrant coconut curry with basil.",
+            time_minutes=30,
+            price=Decimal("7.50"),
+            link="https://example.com/curry",
+        )
+        self.curry.tags.add(*tags)
+        self.curry.ingredients.add(*ingredients)
+        self.soup = Recipe.objects.create(
+            user=self.user,
+            title="Coconut soup",
+            time_minutes=15,
+            price=Decimal("4.00"),
+        )
+        self.soup.tags.add(tags[1])
+        Recipe.objects.filter(pk=self.soup.pk).update(
+            image="uploads/recipe/soup.jpg",
+            image_renditions={
+                "thumb": {"webp": "uploads/recipe/renditions/soup/thumb.webp"},
+            },
+        )
+        Recipe.objects.create(
+            user=self.user,
+            title="Plain rice",
+            time_minutes=20,
+            price=Decimal("1.25"),
+        )
+
+    def fetch(self, url, params):
+        cache.clear()
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.content
+
+    def assertSameOutput(self, url, params=None):
+        with mock.patch.object(
+            ReadPlan, "render", autospec=True, side_effect=ReadPlan.render
+        ) as render:
+            fast = self.fetch(url, params)
+        render.assert_called_once()
+        with mock.patch.object(RecipeViewSets, "fast_read_actions", set()):
+            slow = self.fetch(url, params)
+        self.assertEqual(fast, slow)
+
+    def test_list_matches_serializer(self):
+        cases = [
+            {},
+            {"q": "coconut"},
+            {"tags": str(self.curry.tags.first().id)},
+            {"page_size": 2},
+            {"fields": "id,title,price,tags"},
+            {"fields": "title,tags.name,ingredients", "expand": "ingredients"},
+            {"expand": "tags"},
+            {"q": "coconut", "fields": "id,headline"},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                self.assertSameOutput(RECIPES_URL, params)
+
+    def test_retrieve_matches_serializer(self):
+        for recipe in Recipe.objects.all():
+            with self.subTest(recipe=recipe.title):
+                self.assertSameOutput(detail_url(recipe.id))
+        self.assertSameOutput(
+            detail_url(self.curry.id), {"fields": "title,description,tags"}
+        )
+
+    def test_retrieve_other_users_recipe_not_found(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpass123",
+        )
+        recipe = Recipe.objects.create(
+            user=other, title="Secret", time_minutes=5, price=Decimal("1.00")
+        )
+
+        res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_plan_compiles_for_read_serializers(self):
+        request = APIRequestFactory().get(RECIPES_URL)
+        queryset = Recipe.objects.search("curry")
+        for serializer_class in (
+            serializers.RecipeSerializer,
+            serializers.RecipeDetailSerializer,
+            serializers.RecipeSearchSerializer,
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                serializer = serializer_class(context={"request": request})
+
+                self.assertIsNotNone(ReadPlan.compile(serializer, queryset))
+
+    def test_unsupported_fields_fall_back(self):
+        class WithMethodField(serializers.RecipeSerializer):
+            summary = SerializerMethodField()
+
+            class Meta(serializers.RecipeSerializer.Meta):
+                fields = serializers.RecipeSerializer.Meta.fields + [
+                    "summary"
+                ]
+
+        serializer = WithMethodField()
+
+        self.assertIsNone(ReadPlan.compile(serializer, Recipe.objects.all()))
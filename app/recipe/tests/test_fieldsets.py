@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Thai green curry",
+            description="A fragrant coconut curry.",
+            time_minutes=30,
+            price=Decimal("7.50"),
+        )
+        self.tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name="Basil"
+        )
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        # The first queries are authentication and library versioning.
+        recipe_sql = [
+            q['sql'] for q in ctx.captured_queries
+            if '"core_recipe' in q['sql'] or '"core_tag' in q['sql']
+            or '"core_ingredient' in q['sql']
+        ]
+        return res, recipe_sql
+
+    def test_fields_prune_columns_and_relations(self):
+        res, sql = self.get(RECIPES_URL, fields='id,title')
+
+        self.assertEqual(
+            res.data, [{'id': self.recipe.id, 'title': self.recipe.title}]
+        )
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('"price"', sql[0])
+        self.assertNotIn('"description"', sql[0])
+
+    def test_unexpanded_relations_are_ids(self):
+        res, sql = self.get(RECIPES_URL, fields='title,tags')
+
+        self.assertEqual(res.data[0], {
+            'title': self.recipe.title,
+            'tags': [self.tag.id],
+        })
+        self.assertEqual(len(sql), 2)
+        self.assertNotIn('"name"', sql[1])
+
+    def test_dotted_fields_expand_and_trim(self):
+        res, sql = self.get(RECIPES_URL, fields='id,tags.name')
+
+        self.assertEqual(res.data[0]['tags'], [{'name': 'Dinner'}])
+        self.assertNotIn('"created_at"', sql[1])
+
+    def test_expand_alone_keeps_other_fields(self):
+        res, _ = self.get(RECIPES_URL, expand='tags')
+
+        self.assertEqual(res.data[0]['title'], self.recipe.title)
+        self.assertEqual(res.data[0]['tags'][0]['name'], 'Dinner')
+        self.assertEqual(res.data[0]['ingredients'], [self.ingredient.id])
+
+    def test_retrieve_with_fields(self):
+        res, _ = self.get(
+            detail_url(self.recipe.id), fields='title,description'
+        )
+
+        self.assertEqual(res.data, {
+            'title': self.recipe.title,
+            'description': self.recipe.description,
+        })
+
+    def test_search_skips_unrequested_headline(self):
+        res, sql = self.get(RECIPES_URL, q='curry', fields='id,rank')
+
+        self.assertEqual(list(res.data[0]), ['id', 'rank'])
+        self.assertNotIn('ts_headline', sql[0])
+
+    def test_unknown_fields_rejected(self):
+        cases = [
+            {'fields': 'id,calories'},
+            {'fields': 'tags.colour'},
+            {'fields': 'title.length'},
+            {'expand': 'title'},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                res = self.client.get(RECIPES_URL, params)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,228 @@
+import shutil
+import tempfile
+from io import StringIO
+from decimal import Decimal
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ImageJob, Recipe
+from recipe import images
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(recipe_id):
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def recipe_detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def make_jpeg(size=(2000, 1000), orientation=None):
+    img = Image.new('RGB', size, color=(200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'
+    if orientation:
+        exif[0x0112] = orientation
+    ntf = tempfile.NamedTemporaryFile(suffix='.jpg')
+    img.save(ntf, format='JPEG', exif=exif.tobytes())
+    ntf.seek(0)
+    return ntf
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImagePipelineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Pasta",
+            time_minutes=10,
+            price=Decimal("5.00"),
+        )
+
+    def upload(self, **kwargs):
+        with make_jpeg(**kwargs) as ntf:
+            return self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart',
+            )
+
+    def test_upload_queues_job_without_processing(self):
+        res = self.upload()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_renditions'], {})
+        job = ImageJob.objects.get(recipe=self.recipe)
+        self.assertEqual(job.status, ImageJob.Status.PENDING)
+
+    def test_worker_writes_renditions(self):
+        self.upload(orientation=6)
+
+        self.assertEqual(images.run_pending(), 1)
+
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        renditions = self.recipe.image_renditions
+        self.assertEqual(set(renditions), set(images.RENDITIONS))
+        for name, formats in renditions.items():
+            self.assertEqual(set(formats), set(images.FORMATS))
+            for path in formats.values():
+                with storage.open(path) as f, Image.open(f) as img:
+                    # Orientation 6 rotates the 2:1 landscape to portrait.
+                    self.assertEqual(
+                        img.size,
+                        (images.RENDITIONS[name] // 2, images.RENDITIONS[name]),
+                    )
+                    self.assertNotIn(0x010F, img.getexif())
+        self.assertEqual(
+            ImageJob.objects.get().status, ImageJob.Status.DONE
+        )
+
+    def test_rendition_urls_in_recipe_payload(self):
+        self.upload()
+        images.run_pending()
+
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        url = res.data['image_renditions']['thumb']['webp']
+        self.assertTrue(url.startswith('http://testserver/media/'))
+        self.assertTrue(url.endswith('-thumb.webp'))
+
+    def test_small_images_are_not_upscaled(self):
+        self.upload(size=(100, 80))
+        images.run_pending()
+
+        self.recipe.refresh_from_db()
+        path = self.recipe.image_renditions['large']['jpeg']
+        with self.recipe.image.storage.open(path) as f, Image.open(f) as img:
+            self.assertEqual(img.size, (100, 80))
+
+    def test_superseded_job_is_skipped(self):
+        self.upload()
+        self.upload()
+
+        images.run_pending()
+
+        self.recipe.refresh_from_db()
+        jobs = ImageJob.objects.order_by('id')
+        self.assertEqual([j.status for j in jobs], ['done', 'done'])
+        self.assertIn(
+            jobs[1].image.rsplit('/', 1)[-1].split('.')[0],
+            self.recipe.image_renditions['thumb']['jpeg'],
+        )
+
+    def stored_renditions(self):
+        self.recipe.refresh_from_db()
+        paths = images.rendition_paths(self.recipe.image_renditions)
+        self.assertEqual(len(paths), len(images.RENDITIONS) * 2)
+        return paths
+
+    def assertStored(self, paths, stored=True):
+        storage = self.recipe.image.storage
+        for path in paths:
+            self.assertEqual(storage.exists(path), stored, path)
+
+    def test_replaced_and_deleted_images_leave_no_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+            images.run_pending()
+        first = self.stored_renditions()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+        self.assertStored(first, stored=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.run_pending()
+        second = self.stored_renditions()
+        self.assertStored(second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertStored(second, stored=False)
+
+    def test_reprocessing_keeps_the_current_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+            images.run_pending()
+            self.recipe.refresh_from_db()
+            images.enqueue(self.recipe)
+            images.run_pending()
+
+        self.assertStored(self.stored_renditions())
+
+    def test_renditions_of_a_superseded_render_are_removed(self):
+        self.upload()
+        job = ImageJob.objects.select_related('recipe').get()
+        # Replaced after the worker claimed the job, before it published.
+        Recipe.objects.filter(pk=self.recipe.pk).update(image='other.jpg')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.process(job)
+
+        self.assertStored([
+            images.rendition_path(job.image, name, ext)
+            for name in images.RENDITIONS
+            for ext in images.FORMATS
+        ], stored=False)
+        self.assertEqual(Recipe.objects.get().image_renditions, {})
+
+    def test_failures_are_retried_then_marked_failed(self):
+        self.upload()
+
+        with patch('recipe.images.render', side_effect=OSError('broken')):
+            for _ in range(images.MAX_ATTEMPTS):
+                images.run_pending(limit=1)
+
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, ImageJob.Status.FAILED)
+        self.assertEqual(job.attempts, images.MAX_ATTEMPTS)
+        self.assertIn('broken', job.error)
+
+    def test_worker_command_once(self):
+        self.upload()
+        upload = SimpleUploadedFile('x.jpg', b'not an image')
+        other = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price="1.00",
+            image=upload,
+        )
+        images.enqueue(other)
+
+        call_command('process_image_jobs', once=True, stdout=StringIO())
+
+        statuses = dict(ImageJob.objects.values_list('recipe_id', 'status'))
+        self.assertEqual(statuses[self.recipe.id], ImageJob.Status.DONE)
+        self.assertEqual(statuses[other.id], ImageJob.Status.PENDING)
+
+    def test_worker_refreshes_connections_between_polls(self):
+        path = 'core.management.commands.process_image_jobs'
+        with patch(f'{path}.close_old_connections') as close, \
+                patch(f'{path}.time.sleep', side_effect=[None, StopIteration]):
+            with self.assertRaises(StopIteration):
+                call_command('process_image_jobs', stdout=StringIO())
+
+        self.assertEqual(close.call_count, 1)
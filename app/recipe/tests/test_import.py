@@ -0,0 +1,177 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.importers import RecipeImporter, parse_csv, parse_jsonl
+
+
+BULK_URL = reverse('recipe:recipe-bulk-import')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def recipe_row(i, **params):
+    row = {
+        "title": f"Recipe {i}",
+        "time_minutes": 10 + i,
+        "price": "12.50",
+        "tags": [{"name": "Dinner"}, {"name": f"Tag {i % 3}"}],
+        "ingredients": [{"name": f"Ingredient {i % 5}"}],
+    }
+    row.update(params)
+    return row
+
+
+class RecipeImporterTests(TestCase):
+    def setUp(self):
+        self.user = create_user(email="test@example.com", password="pass1234")
+
+    def test_import_jsonl(self):
+        lines = [json.dumps(recipe_row(i)) for i in range(4)]
+
+        importer = RecipeImporter(self.user).run(parse_jsonl(lines))
+
+        self.assertEqual(importer.summary, {"created": 4, "errors": []})
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 4)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(), 4
+        )
+        recipe = recipes.get(title="Recipe 1")
+        self.assertEqual(recipe.price, Decimal("12.50"))
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Dinner", "Tag 1"],
+        )
+
+    def test_import_csv(self):
+        lines = [
+            "title,time_minutes,price,tags,ingredients\n",
+            "Pasta,20,9.99,Dinner;Italian,Flour;Eggs\n",
+            "Soup,15,4.50,,\n",
+        ]
+
+        importer = RecipeImporter(self.user).run(parse_csv(lines))
+
+        self.assertEqual(importer.created, 2)
+        pasta = Recipe.objects.get(user=self.user, title="Pasta")
+        self.assertEqual(pasta.tags.count(), 2)
+        self.assertEqual(pasta.ingredients.count(), 2)
+        self.assertEqual(
+            Recipe.objects.get(user=self.user, title="Soup").tags.count(), 0
+        )
+
+    def test_reuses_existing_tags_and_slugs(self):
+        Tag.objects.create(user=self.user, name="Dinner")
+        Recipe.objects.create(
+            user=self.user, title="Recipe 0", time_minutes=5, price="1.00"
+        )
+
+        RecipeImporter(self.user).run(parse_jsonl([json.dumps(recipe_row(0))]))
+
+        self.assertEqual(Tag.objects.filter(name="Dinner").count(), 1)
+        self.assertEqual(
+            sorted(Recipe.objects.values_list("slug", flat=True)),
+            ["recipe-0", "recipe-0-1"],
+        )
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        lines = [
+            json.dumps(recipe_row(0)),
+            "{not json",
+            json.dumps(recipe_row(2, time_minutes=0)),
+            json.dumps(recipe_row(3)),
+        ]
+
+        importer = RecipeImporter(self.user, chunk_size=2).run(
+            parse_jsonl(lines)
+        )
+
+        self.assertEqual(importer.created, 2)
+        self.assertEqual([e["row"] for e in importer.errors], [2, 3])
+        self.assertIn("time_minutes", importer.errors[1]["errors"])
+
+    def test_query_count_per_chunk_is_constant(self):
+        def queries_for(count, offset):
+            lines = [json.dumps(recipe_row(offset + i)) for i in range(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                RecipeImporter(self.user).run(parse_jsonl(lines))
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries_for(2, 0), queries_for(50, 100))
+
+
+class BulkImportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="pass1234")
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_import_json_list(self):
+        payload = [recipe_row(0), recipe_row(1, price="-")]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["errors"][0]["row"], 2)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_import_uploaded_jsonl(self):
+        body = "\n".join(json.dumps(recipe_row(i)) for i in range(3))
+        upload = SimpleUploadedFile("recipes.jsonl", body.encode())
+
+        res = self.client.post(BULK_URL, {"file": upload}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 3, "errors": []})
+
+    def test_bulk_import_uploaded_csv(self):
+        body = "title,time_minutes,price,tags\nPasta,20,9.99,Dinner;Italian\n"
+        upload = SimpleUploadedFile("recipes.csv", body.encode())
+
+        res = self.client.post(BULK_URL, {"file": upload}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.tags.count(), 2)
+
+    def test_bulk_import_uploaded_csv_with_multiline_fields(self):
+        title = 'Pasta\r\nwith "al dente" noodles\nand cheese'
+        body = (
+            '\ufefftitle,time_minutes,price,tags\r\n'
+            '"Pasta\r\nwith ""al dente"" noodles\nand cheese",20,9.99,Dinner'
+            '\r\n'
+            'Soup,15,4.50,Dinner\r\n'
+        )
+        upload = SimpleUploadedFile("recipes.csv", body.encode())
+
+        res = self.client.post(BULK_URL, {"file": upload}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 2, "errors": []})
+        self.assertEqual(
+            sorted(Recipe.objects.filter(user=self.user).values_list(
+                "title", flat=True
+            )),
+            [title, "Soup"],
+        )
+
+    def test_bulk_import_requires_file_or_list(self):
+        res = self.client.post(BULK_URL, {}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -9,7 +9,7 @@ from rest_framework.test import APIClient
 
 from core.models import Ingredient, Recipe
 
-from recipe.serializers import IngredientSerializer
+from recipe.serializers import IngredientDetailSerializer
 
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
@@ -50,7 +50,7 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         ingredients = Ingredient.objects.all().order_by("-id")
-        serializer = IngredientSerializer(ingredients, many=True)
+        serializer = IngredientDetailSerializer(ingredients, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
@@ -119,8 +119,9 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
-        s1 = IngredientSerializer(in1)
-        s2 = IngredientSerializer(in2)
+        in1.refresh_from_db()
+        s1 = IngredientDetailSerializer(in1)
+        s2 = IngredientDetailSerializer(in2)
         self.assertIn(s1.data, res.data)
         self.assertNotIn(s2.data, res.data)
 
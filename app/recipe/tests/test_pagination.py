@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample Recipe Name",
+        "time_minutes": 22,
+        "price": Decimal("560.75"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            name="Test User",
+            email="test@example.com",
+            password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.recipes = [
+            create_recipe(user=self.user, title=f"Recipe {i}")
+            for i in range(5)
+        ]
+
+    def test_list_is_unpaginated_by_default(self):
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+        self.assertEqual(len(res.data), 5)
+
+    def test_page_size_opts_into_cursor_pages(self):
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]],
+            [self.recipes[4].id, self.recipes[3].id],
+        )
+        self.assertIsNotNone(res.data["next"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_walk_all_pages(self):
+        ids = []
+        url, params = RECIPES_URL, {"page_size": 2}
+        while url:
+            res = self.client.get(url, params)
+            ids.extend(r["id"] for r in res.data["results"])
+            url, params = res.data["next"], None
+
+        self.assertEqual(ids, [r.id for r in reversed(self.recipes)])
+
+    def test_cursor_stable_under_concurrent_inserts(self):
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+        create_recipe(user=self.user, title="Inserted later")
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]],
+            [self.recipes[2].id, self.recipes[1].id],
+        )
+
+    def test_later_pages_seek_by_id_without_offset(self):
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(res.data["next"])
+        page_sql = next(
+            q["sql"] for q in queries if 'FROM "core_recipe"' in q["sql"]
+        )
+        self.assertNotIn("OFFSET", page_sql)
+        self.assertIn('"core_recipe"."id" <', page_sql)
+
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]],
+            [self.recipes[4].id, self.recipes[3].id],
+        )
+        self.assertIsNone(res.data["previous"])
+
+    def test_page_size_is_capped(self):
+        res = self.client.get(RECIPES_URL, {"page_size": 10_000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_tags_paginate_with_cursor(self):
+        for name in ("Vegan", "Dessert", "Lunch"):
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t["name"] for t in res.data["results"]],
+            ["Lunch", "Dessert"],
+        )
+        res = self.client.get(res.data["next"])
+        self.assertEqual([t["name"] for t in res.data["results"]], ["Vegan"])
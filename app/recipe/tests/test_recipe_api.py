@@ -5,7 +5,9 @@ from decimal import Decimal
 from PIL import Image
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
@@ -396,6 +398,191 @@ class PrivateRecipeAPITests(TestCase):
         self.assertIn(serializer2.data, res.data)
         self.assertNotIn(serializer3.data, res.data)
 
+    def test_filter_recipes_matching_any_tag_listed_once(self):
+        recipe = create_recipe(user=self.user, title='Tofu scramble')
+        tag1 = create_tag(user=self.user, name='Vegan')
+        tag2 = create_tag(user=self.user, name='Breakfast')
+        recipe.tags.add(tag1, tag2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                RECIPES_URL,
+                {'tags': f'{tag1.id},{tag2.id}'}
+            )
+
+        self.assertEqual([r['id'] for r in res.data], [recipe.id])
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertIn('EXISTS', sql)
+
+    def test_filter_recipes_matching_all_tags(self):
+        recipe1 = create_recipe(user=self.user, title='Tofu scramble')
+        recipe2 = create_recipe(user=self.user, title='Green smoothie')
+        tag1 = create_tag(user=self.user, name='Vegan')
+        tag2 = create_tag(user=self.user, name='Breakfast')
+        recipe1.tags.add(tag1, tag2)
+        recipe2.tags.add(tag1)
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': f'{tag1.id},{tag2.id}', 'tags_match': 'all'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in res.data], [recipe1.id])
+
+    def test_filter_recipes_matching_all_ingredients(self):
+        recipe1 = create_recipe(user=self.user, title='Caprese salad')
+        recipe2 = create_recipe(user=self.user, title='Tomato soup')
+        ingredient1 = create_ingredient(user=self.user, name='Tomato')
+        ingredient2 = create_ingredient(user=self.user, name='Mozzarella')
+        recipe1.ingredients.add(ingredient1, ingredient2)
+        recipe2.ingredients.add(ingredient1)
+
+        res = self.client.get(
+            RECIPES_URL,
+            {
+                'ingredients': f'{ingredient1.id},{ingredient2.id}',
+                'ingredients_match': 'all',
+            }
+        )
+
+        self.assertEqual([r['id'] for r in res.data], [recipe1.id])
+
+    def test_filter_recipes_unknown_match_mode(self):
+        tag = create_tag(user=self.user, name='Vegan')
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': f'{tag.id}', 'tags_match': 'some'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags_match', res.data)
+
+
+class RecipeQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            name="Test User",
+            email="test@example.com",
+            password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_recipes(self, count):
+        for i in range(count):
+            recipe = create_recipe(user=self.user, title=f"Recipe {i}")
+            recipe.tags.add(
+                create_tag(user=self.user, name=f"Tag {i}"),
+                create_tag(user=self.user, name=f"Other tag {i}"),
+            )
+            recipe.ingredients.add(
+                create_ingredient(user=self.user, name=f"Ingredient {i}"),
+            )
+        return recipe
+
+    def count_queries(self, method, *args, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            res = getattr(self.client, method)(*args, **kwargs)
+        self.assertLess(res.status_code, 300)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        self.create_recipes(1)
+        baseline = self.count_queries("get", RECIPES_URL)
+        self.create_recipes(15)
+
+        with self.assertNumQueries(baseline):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 16)
+        self.assertLessEqual(baseline, 4)
+
+    def test_retrieve_query_count_is_constant(self):
+        recipe = self.create_recipes(1)
+        baseline = self.count_queries("get", recipe_detail_url(recipe.id))
+        recipe = self.create_recipes(15)
+
+        with self.assertNumQueries(baseline):
+            self.client.get(recipe_detail_url(recipe.id))
+
+        self.assertLessEqual(baseline, 4)
+
+    def test_create_query_count_is_independent_of_library_size(self):
+        payload = {
+            "title": "Thai Prawn Curry",
+            "time_minutes": 30,
+            "price": Decimal("325.24"),
+        }
+        baseline = self.count_queries(
+            "post", RECIPES_URL, payload, format="json"
+        )
+        self.create_recipes(15)
+
+        payload["title"] = "Green Curry"
+        with self.assertNumQueries(baseline):
+            self.client.post(RECIPES_URL, payload, format="json")
+
+    def test_update_query_count_is_independent_of_library_size(self):
+        recipe = self.create_recipes(1)
+        payload = {"title": "Chicken tikka"}
+        baseline = self.count_queries(
+            "patch", recipe_detail_url(recipe.id), payload, format="json"
+        )
+        self.create_recipes(15)
+
+        with self.assertNumQueries(baseline):
+            self.client.patch(
+                recipe_detail_url(recipe.id), payload, format="json"
+            )
+
+    def test_create_query_count_is_independent_of_nested_items(self):
+        def payload(size, prefix):
+            return {
+                "title": f"{prefix} Curry",
+                "time_minutes": 30,
+                "price": Decimal("325.24"),
+                "tags": [{"name": f"{prefix} tag {i}"} for i in range(size)],
+                "ingredients": [
+                    {"name": f"{prefix} ingredient {i}"} for i in range(size)
+                ],
+            }
+
+        baseline = self.count_queries(
+            "post", RECIPES_URL, payload(1, "Red"), format="json"
+        )
+
+        with self.assertNumQueries(baseline):
+            res = self.client.post(
+                RECIPES_URL, payload(30, "Green"), format="json"
+            )
+
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(recipe.tags.count(), 30)
+        self.assertEqual(recipe.ingredients.count(), 30)
+
+    def test_update_nested_items_only_touches_changed_rows(self):
+        recipe = create_recipe(user=self.user)
+        keep = create_tag(user=self.user, name="Keep")
+        drop = create_tag(user=self.user, name="Drop")
+        recipe.tags.add(keep, drop)
+        through = Recipe.tags.through
+        kept_row = through.objects.get(recipe=recipe, tag=keep)
+
+        payload = {"tags": [{"name": "Keep"}, {"name": "New"}]}
+        res = self.client.patch(
+            recipe_detail_url(recipe.id), payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(through.objects.filter(pk=kept_row.pk).exists())
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Keep", "New"],
+        )
+
 
 class RecipeImageUploadTests(TestCase):
     def setUp(self):
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Ingredient, LibraryVersion, Recipe, Tag, Tombstone
+from recipe.importers import RecipeImporter
+
+
+def create_recipe(user, title):
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=Decimal("5.00"),
+    )
+
+
+class RecipeCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.other = Tag.objects.create(user=self.user, name="Lunch")
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name="Rice"
+        )
+        self.recipe = create_recipe(self.user, "Risotto")
+
+    def assertCounts(self, *expected):
+        objs = (self.tag, self.other, self.ingredient)
+        for obj in objs:
+            obj.refresh_from_db()
+        self.assertEqual(tuple(obj.recipe_count for obj in objs), expected)
+
+    def test_add_and_remove(self):
+        self.recipe.tags.add(self.tag, self.other)
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+        self.assertCounts(1, 1, 1)
+
+        self.recipe.tags.remove(self.tag)
+        self.recipe.tags.remove(self.tag)
+        self.assertCounts(0, 1, 1)
+
+    def test_set_and_clear(self):
+        self.recipe.tags.set([self.tag])
+        self.recipe.tags.set([self.other])
+        self.assertCounts(0, 1, 0)
+
+        self.recipe.tags.clear()
+        self.assertCounts(0, 0, 0)
+
+    def test_reverse_side(self):
+        second = create_recipe(self.user, "Paella")
+        self.tag.recipe_set.add(self.recipe, second)
+        self.assertCounts(2, 0, 0)
+
+        self.tag.recipe_set.remove(second, second)
+        self.assertCounts(1, 0, 0)
+
+        self.tag.recipe_set.clear()
+        self.assertCounts(0, 0, 0)
+
+    def test_recipe_delete(self):
+        second = create_recipe(self.user, "Paella")
+        for recipe in (self.recipe, second):
+            recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+
+        self.recipe.delete()
+        self.assertCounts(1, 0, 1)
+
+        Recipe.objects.filter(pk=second.pk).delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_queryset_delete_costs_the_same_for_any_size(self):
+        def delete_recipes(count):
+            recipes = [
+                create_recipe(self.user, f"Bowl {n}") for n in range(count)
+            ]
+            for recipe in recipes:
+                recipe.tags.add(self.tag, self.other)
+                recipe.ingredients.add(self.ingredient)
+            ids = [recipe.pk for recipe in recipes]
+            before = LibraryVersion.current(self.user.pk)
+            with CaptureQueriesContext(connection) as queries:
+                Recipe.objects.filter(pk__in=ids).delete()
+            self.assertCounts(0, 0, 0)
+            self.assertGreater(LibraryVersion.current(self.user.pk), before)
+            self.assertEqual(
+                sorted(Tombstone.objects.filter(
+                    kind="recipe", object_id__in=ids
+                ).values_list("object_id", flat=True)),
+                ids,
+            )
+            return len(queries)
+
+        self.assertEqual(delete_recipes(2), delete_recipes(10))
+
+    def test_bulk_import(self):
+        rows = [
+            {"title": f"Bowl {i}", "time_minutes": 5, "price": "3.00",
+             "tags": [{"name": "Dinner"}, {"name": "Dinner"}],
+             "ingredients": [{"name": "Rice"}]}
+            for i in range(3)
+        ]
+        RecipeImporter(self.user).run(
+            (row, data, None) for row, data in enumerate(rows, start=1)
+        )
+
+        self.assertCounts(3, 0, 3)
+
+    def test_reconcile_fixes_drift(self):
+        self.recipe.tags.add(self.tag)
+        Tag.objects.filter(pk=self.tag.pk).update(recipe_count=7)
+        Tag.objects.filter(pk=self.other.pk).update(recipe_count=2)
+
+        fixed = Tag.objects.filter(user=self.user).reconcile_recipe_counts()
+
+        self.assertEqual(fixed, 2)
+        self.assertCounts(1, 0, 0)
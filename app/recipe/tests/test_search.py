@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "time_minutes": 22,
+        "price": Decimal("5.75"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.curry = create_recipe(
+            user=self.user,
+            title="Thai green curry",
+            description="A fragrant coconut curry with basil.",
+        )
+        self.soup = create_recipe(
+            user=self.user,
+            title="Coconut soup",
+            description="Light broth, finished with a spoon of curry paste.",
+        )
+        self.tart = create_recipe(
+            user=self.user,
+            title="Lemon tart",
+            description="Buttery pastry and sharp lemon curd.",
+        )
+
+    def test_search_filters_and_ranks(self):
+        res = self.client.get(RECIPES_URL, {"q": "curry"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["id"] for r in res.data], [self.curry.id, self.soup.id]
+        )
+        self.assertGreater(res.data[0]["rank"], res.data[1]["rank"])
+
+    def test_search_matches_word_forms(self):
+        res = self.client.get(RECIPES_URL, {"q": "curries"})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_search_returns_highlighted_headline(self):
+        res = self.client.get(RECIPES_URL, {"q": "lemon"})
+
+        self.assertEqual(len(res.data), 1)
+        self.assertIn("<mark>lemon</mark>", res.data[0]["headline"])
+
+    def test_search_supports_web_syntax(self):
+        res = self.client.get(RECIPES_URL, {"q": "coconut -soup"})
+
+        self.assertEqual([r["id"] for r in res.data], [self.curry.id])
+
+    def test_search_limited_to_user(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpass123",
+        )
+        create_recipe(user=other, title="Red curry")
+
+        res = self.client.get(RECIPES_URL, {"q": "curry"})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_plain_list_has_no_search_fields(self):
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotIn("rank", res.data[0])
@@ -0,0 +1,207 @@
+import math
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import similarity
+from recipe.serializers import RecipeSerializer
+
+
+def similar_url(recipe_id):
+    return reverse('recipe:recipe-similar', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 10,
+        "price": Decimal("5.00"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def features(recipe):
+    return (
+        {("tag", pk) for pk in recipe.tags.values_list("id", flat=True)}
+        | {("ingredient", pk)
+           for pk in recipe.ingredients.values_list("id", flat=True)}
+    )
+
+
+class SimilarityIndexTests(TestCase):
+    def setUp(self):
+        similarity.indexes.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        rng = random.Random(3)
+        tags = [
+            Tag.objects.create(user=self.user, name=f"Tag {n}")
+            for n in range(6)
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=f"Ingredient {n}")
+            for n in range(8)
+        ]
+        self.recipes = []
+        for n in range(25):
+            recipe = create_recipe(self.user, title=f"Recipe {n}")
+            recipe.tags.add(*rng.sample(tags, rng.randint(0, 3)))
+            recipe.ingredients.add(*rng.sample(ingredients, rng.randint(1, 4)))
+            self.recipes.append(recipe)
+
+    def brute_force(self, target, metric):
+        wanted = features(target)
+        scores = []
+        for recipe in self.recipes:
+            have = features(recipe)
+            shared = len(wanted & have)
+            if recipe == target or not shared:
+                continue
+            if metric == similarity.COSINE:
+                score = shared / math.sqrt(len(wanted) * len(have))
+            else:
+                score = shared / len(wanted | have)
+            scores.append((recipe.id, score))
+        scores.sort(key=lambda item: (-item[1], -item[0]))
+        return scores
+
+    def test_ranking_matches_brute_force(self):
+        index = similarity.indexes.get(self.user.pk)
+
+        for metric in similarity.METRICS:
+            for target in self.recipes[:8]:
+                for limit in (3, 50):
+                    ranked = index.similar(target.id, limit, metric)
+                    expected = self.brute_force(target, metric)[:limit]
+                    self.assertEqual(
+                        [pk for pk, _ in ranked], [pk for pk, _ in expected]
+                    )
+                    for (_, got), (_, want) in zip(ranked, expected):
+                        self.assertAlmostEqual(got, want)
+
+    def test_index_follows_changes_without_rebuilding(self):
+        similarity.indexes.get(self.user.pk)
+        first, second, third = self.recipes[:3]
+        third_id = third.id
+
+        first.tags.clear()
+        second.ingredients.add(*Ingredient.objects.filter(user=self.user))
+        third.delete()
+        self.recipes.remove(third)
+        Tag.objects.filter(user=self.user).first().delete()
+        late = create_recipe(self.user, title="Late")
+        late.ingredients.add(*first.ingredients.all())
+        self.recipes.append(late)
+
+        with mock.patch.object(
+            similarity.SimilarityIndex, "build",
+            side_effect=AssertionError("rebuilt"),
+        ):
+            index = similarity.indexes.get(self.user.pk)
+
+        self.assertNotIn(third_id, index)
+        self.assertIn(late.id, index)
+        for target in (first, second, late):
+            self.assertEqual(
+                index.similar(target.id, 50, similarity.JACCARD),
+                self.brute_force(target, similarity.JACCARD),
+            )
+
+    def test_edits_that_keep_links_reuse_the_arrays(self):
+        before = similarity.indexes.get(self.user.pk)
+
+        self.recipes[0].title = "Renamed"
+        self.recipes[0].save()
+        after = similarity.indexes.get(self.user.pk)
+
+        self.assertNotEqual(after.version, before.version)
+        self.assertIs(after.features, before.features)
+
+    def test_unchanged_library_is_not_reread(self):
+        similarity.indexes.get(self.user.pk)
+
+        with self.assertNumQueries(1):
+            similarity.indexes.get(self.user.pk)
+
+
+class SimilarRecipesApiTests(TestCase):
+    def setUp(self):
+        similarity.indexes.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        dinner = Tag.objects.create(user=self.user, name="Dinner")
+        vegan = Tag.objects.create(user=self.user, name="Vegan")
+        rice = Ingredient.objects.create(user=self.user, name="Rice")
+        self.curry = create_recipe(self.user, title="Curry")
+        self.curry.tags.add(dinner, vegan)
+        self.curry.ingredients.add(rice)
+        self.stir_fry = create_recipe(self.user, title="Stir fry")
+        self.stir_fry.tags.add(dinner, vegan)
+        self.soup = create_recipe(self.user, title="Soup")
+        self.soup.tags.add(dinner)
+        create_recipe(self.user, title="Unrelated")
+
+    def test_returns_list_representation_with_scores(self):
+        res = self.client.get(similar_url(self.curry.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = [
+            {**RecipeSerializer(self.stir_fry).data, "similarity": 0.6667},
+            {**RecipeSerializer(self.soup).data, "similarity": 0.3333},
+        ]
+        self.assertEqual(res.json(), expected)
+
+    def test_limit_and_metric(self):
+        res = self.client.get(
+            similar_url(self.curry.id), {"limit": 1, "metric": "cosine"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(r["id"], r["similarity"]) for r in res.json()],
+            [(self.stir_fry.id, round(2 / math.sqrt(6), 4))],
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"limit": 0}, {"limit": 51}, {"limit": "x"},
+                       {"metric": "euclid"}):
+            res = self.client.get(similar_url(self.curry.id), params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_recipes_are_not_found(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        foreign = create_recipe(other)
+
+        for recipe_id in (foreign.id, 0):
+            res = self.client.get(similar_url(recipe_id))
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_response_tracks_library_changes(self):
+        self.client.get(similar_url(self.curry.id))
+
+        self.soup.tags.add(*self.curry.tags.all())
+        res = self.client.get(similar_url(self.curry.id))
+
+        self.assertEqual(
+            [r["id"] for r in res.json()],
+            [self.soup.id, self.stir_fry.id],
+        )
@@ -0,0 +1,186 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag, Tombstone
+from recipe.serializers import RecipeSerializer
+from recipe.sync import decode_token, encode_token
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 10,
+        "price": Decimal("5.00"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class SyncTokenTests(TestCase):
+    def test_token_round_trip(self):
+        now = timezone.now()
+
+        self.assertEqual(decode_token(encode_token(now)), now)
+
+    def test_iso_timestamps_are_accepted(self):
+        moment = decode_token("2026-05-01T10:00:00 00:00")
+
+        self.assertEqual(moment.isoformat(), "2026-05-01T10:00:00+00:00")
+        self.assertIsNotNone(decode_token("2026-05-01T10:00:00"))
+
+    def test_garbage_is_rejected(self):
+        for value in ("", "yesterday", "!!!", encode_token(timezone.now())[:5]):
+            self.assertIsNone(decode_token(value))
+
+
+@override_settings(DELTA_SYNC={"OVERLAP_SECONDS": 0})
+class DeltaSyncApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.kept = create_recipe(self.user, title="Kept")
+        self.edited = create_recipe(self.user, title="Edited")
+        self.removed = create_recipe(self.user, title="Removed")
+        self.tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.edited.tags.add(self.tag)
+
+    def sync(self, url=RECIPES_URL):
+        res = self.client.get(url, {"since": self.token})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.json()
+        self.token = body["sync_token"]
+        return body
+
+    def test_first_sync_sees_everything_since_the_timestamp(self):
+        since = (timezone.now() - timedelta(hours=1)).isoformat()
+
+        res = self.client.get(RECIPES_URL, {"since": since})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {recipe["id"] for recipe in res.json()["changed"]},
+            {self.kept.id, self.edited.id, self.removed.id},
+        )
+        self.assertEqual(res.json()["deleted"], [])
+
+    def test_later_sync_returns_only_the_changes(self):
+        self.token = encode_token(timezone.now())
+
+        self.client.patch(detail_url(self.edited.id), {"title": "Renamed"})
+        self.client.delete(detail_url(self.removed.id))
+        body = self.sync()
+
+        self.edited.refresh_from_db()
+        self.assertEqual(
+            body["changed"], [RecipeSerializer(self.edited).data]
+        )
+        self.assertEqual(body["deleted"], [self.removed.id])
+
+        body = self.sync()
+        self.assertEqual((body["changed"], body["deleted"]), ([], []))
+
+    def test_tag_changes_mark_their_recipes_changed(self):
+        self.token = encode_token(timezone.now())
+
+        self.tag.name = "Supper"
+        self.tag.save()
+        body = self.sync()
+        self.assertEqual([r["id"] for r in body["changed"]], [self.edited.id])
+        self.assertEqual(body["changed"][0]["tags"][0]["name"], "Supper")
+
+        self.kept.tags.add(self.tag)
+        self.assertEqual(
+            [r["id"] for r in self.sync()["changed"]], [self.kept.id]
+        )
+
+        self.tag.delete()
+        self.assertEqual(
+            {r["id"] for r in self.sync()["changed"]},
+            {self.kept.id, self.edited.id},
+        )
+
+    def test_queryset_deletes_are_synced(self):
+        spare = Tag.objects.create(user=self.user, name="Spare")
+        tag_ids = [self.tag.pk, spare.pk]
+        since = self.token = encode_token(timezone.now())
+
+        Tag.objects.filter(pk__in=tag_ids).delete()
+
+        body = self.sync(TAGS_URL)
+        self.assertEqual(sorted(body["deleted"]), sorted(tag_ids))
+        self.token = since
+        self.assertEqual(
+            {r["id"] for r in self.sync()["changed"]}, {self.edited.id}
+        )
+
+    def test_tags_and_ingredients_sync_their_own_deletions(self):
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        tag_id = self.tag.pk
+        self.token = encode_token(timezone.now())
+
+        self.tag.delete()
+        self.removed.delete()
+        body = self.sync(TAGS_URL)
+        self.assertEqual(body["deleted"], [tag_id])
+
+        ingredient.name = "Sea salt"
+        ingredient.save()
+        body = self.sync(INGREDIENTS_URL)
+        self.assertEqual([i["name"] for i in body["changed"]], ["Sea salt"])
+        self.assertEqual(body["deleted"], [])
+
+    def test_other_users_changes_are_not_visible(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        foreign = create_recipe(other)
+        self.token = encode_token(timezone.now() - timedelta(minutes=1))
+
+        foreign.delete()
+        body = self.sync()
+
+        self.assertNotIn(foreign.id, [r["id"] for r in body["changed"]])
+        self.assertEqual(body["deleted"], [])
+
+    def test_deleting_a_user_leaves_no_tombstones(self):
+        self.user.delete()
+
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_invalid_since_is_rejected(self):
+        res = self.client.get(RECIPES_URL, {"since": "last week"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("since", res.json())
+
+    @override_settings(DELTA_SYNC={"TOMBSTONE_RETENTION_DAYS": 7})
+    def test_since_older_than_retention_needs_a_full_resync(self):
+        since = timezone.now() - timedelta(days=8)
+
+        res = self.client.get(RECIPES_URL, {"since": encode_token(since)})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(res.data["detail"].code, "sync_expired")
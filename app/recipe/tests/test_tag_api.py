@@ -9,7 +9,7 @@ from rest_framework.test import APIClient
 
 from core.models import Tag, Recipe
 
-from recipe.serializers import TagSerializer
+from recipe.serializers import TagDetailSerializer
 
 
 TAGS_URL = reverse('recipe:tag-list')
@@ -50,7 +50,7 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         tags = Tag.objects.all().order_by("-id")
-        serializer = TagSerializer(tags, many=True)
+        serializer = TagDetailSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
@@ -119,8 +119,9 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        s1 = TagSerializer(tag1)
-        s2 = TagSerializer(tag2)
+        tag1.refresh_from_db()
+        s1 = TagDetailSerializer(tag1)
+        s2 = TagDetailSerializer(tag2)
         self.assertIn(s1.data, res.data)
         self.assertNotIn(s2.data, res.data)
 
@@ -145,3 +146,51 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
         self.assertEqual(len(res.data), 1)
+
+    def test_tags_report_recipe_count(self):
+        tag = Tag.objects.create(user=self.user, name='Breakfast')
+        for title in ('Pancakes', 'Porridge'):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=5,
+                price=Decimal('5.00'),
+                user=self.user,
+            )
+            recipe.tags.add(tag)
+
+        res = self.client.get(detail_url(tag.id))
+
+        self.assertEqual(res.data['recipe_count'], 2)
+
+    def test_order_tags_by_popularity(self):
+        quiet = Tag.objects.create(user=self.user, name='Brunch')
+        busy = Tag.objects.create(user=self.user, name='Dinner')
+        unused = Tag.objects.create(user=self.user, name='Supper')
+        for title in ('Stew', 'Curry'):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=30,
+                price=Decimal('8.00'),
+                user=self.user,
+            )
+            recipe.tags.add(busy)
+        recipe.tags.add(quiet)
+
+        res = self.client.get(TAGS_URL, {'ordering': 'popular'})
+
+        self.assertEqual(
+            [tag['id'] for tag in res.data],
+            [busy.id, quiet.id, unused.id],
+        )
+
+    def test_popular_ordering_cannot_be_paginated(self):
+        for params in ({'page_size': 2}, {'cursor': 'cD0x'}):
+            res = self.client.get(TAGS_URL, {'ordering': 'popular', **params})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('ordering', res.data)
+
+    def test_unknown_ordering(self):
+        res = self.client.get(TAGS_URL, {'ordering': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
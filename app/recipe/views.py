@@ -1,3 +1,8 @@
+import io
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -5,13 +10,66 @@ from drf_spectacular.utils import (
     OpenApiTypes
 )
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+
+from core.models import Recipe, RecipeQuerySet, Tag, Ingredient
+from recipe import (
+    exporters,
+    fieldsets,
+    images,
+    importers,
+    serializers,
+    similarity,
+)
+from recipe.async_views import AsyncReadMixin
+from recipe.caching import LibraryCacheMixin
+from recipe.fastread import FastReadMixin
+from recipe.pagination import OptInCursorPagination
+from recipe.sync import DeltaSyncMixin, SINCE_PARAM
+from user.authentication import CachedTokenAuthentication
 
-from core.models import Recipe, Tag, Ingredient
-from recipe import serializers
+MATCH_MODES = [RecipeQuerySet.MATCH_ANY, RecipeQuerySet.MATCH_ALL]
+MAX_BATCH_SIZE = 100
+ATTR_ORDERINGS = {
+    "recent": ("-id",),
+    "popular": ("-recipe_count", "-id"),
+}
+SPARSE_PARAMETERS = [
+    OpenApiParameter(
+        fieldsets.FIELDS_PARAM,
+        OpenApiTypes.STR,
+        description=(
+            'Comma separated fields to return; use tags.name style '
+            'names to pick fields of nested objects.'
+        ),
+    ),
+    OpenApiParameter(
+        fieldsets.EXPAND_PARAM,
+        OpenApiTypes.STR,
+        description=(
+            'Comma separated relations to return as nested objects. '
+            'Once fields or expand is given, other relations are ids.'
+        ),
+    ),
+]
+SYNC_PARAMETERS = [
+    OpenApiParameter(
+        SINCE_PARAM,
+        OpenApiTypes.STR,
+        description=(
+            'A sync_token from an earlier delta response, or an ISO 8601 '
+            'timestamp. Returns {changed, deleted, sync_token} instead of '
+            'a page: rows updated since then, IDs deleted since then, and '
+            'the token for the next sync. Rows may repeat across syncs. '
+            'Answers 410 when the token is older than the deletion '
+            'history; fetch the full list again.'
+        ),
+    ),
+]
 
 
 @extend_schema_view(
@@ -22,41 +80,259 @@ from recipe import serializers
                 OpenApiTypes.STR,
                 description='Comma separated list of tag IDs to filter',
             ),
+            OpenApiParameter(
+                'tags_match',
+                OpenApiTypes.STR,
+                enum=MATCH_MODES,
+                description=(
+                    'Return recipes with any (default) or all of the '
+                    'given tags.'
+                ),
+            ),
             OpenApiParameter(
                 'ingredients',
                 OpenApiTypes.STR,
                 description='Comma separated list of ingredient IDs to filter',
             ),
+            OpenApiParameter(
+                'ingredients_match',
+                OpenApiTypes.STR,
+                enum=MATCH_MODES,
+                description=(
+                    'Return recipes with any (default) or all of the '
+                    'given ingredients.'
+                ),
+            ),
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                description=(
+                    'Full-text search over title and description. Results '
+                    'are ranked by relevance unless paginated, and include '
+                    'a highlighted headline.'
+                ),
+            ),
+            OpenApiParameter(
+                'ids',
+                OpenApiTypes.STR,
+                description=(
+                    f'Comma separated recipe IDs (at most {MAX_BATCH_SIZE}) '
+                    'to fetch in one request, in the detail '
+                    'representation. IDs that do not exist are left out.'
+                ),
+            ),
+            *SPARSE_PARAMETERS,
+            *SYNC_PARAMETERS,
         ]
-    )
+    ),
+    retrieve=extend_schema(parameters=SPARSE_PARAMETERS),
+    batch=extend_schema(
+        methods=['PATCH'],
+        request=serializers.RecipeDetailSerializer(many=True),
+        responses={(200, 'application/json'): OpenApiTypes.OBJECT},
+        description=(
+            'Partially update many recipes at once. Each item needs an '
+            'id. Items are validated like a PATCH to the detail URL and '
+            'saved in one transaction: if any item fails, nothing is '
+            'saved and the response is a 400. Results are per item, in '
+            'request order.'
+        ),
+    ),
+    similar=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description=(
+                    'How many recipes to return (default '
+                    f'{similarity.conf()["DEFAULT_RESULTS"]}, at most '
+                    f'{similarity.conf()["MAX_RESULTS"]}).'
+                ),
+            ),
+            OpenApiParameter(
+                'metric',
+                OpenApiTypes.STR,
+                enum=similarity.METRICS,
+                description=(
+                    'Score by Jaccard (default) or cosine similarity of '
+                    'the tag and ingredient sets.'
+                ),
+            ),
+        ],
+        responses=serializers.RecipeSerializer(many=True),
+        description=(
+            'Recipes in your library sharing tags or ingredients with '
+            'this one, most similar first, each with a similarity score '
+            'between 0 and 1.'
+        ),
+    ),
+    export=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'export_format',
+                OpenApiTypes.STR,
+                enum=list(exporters.CONTENT_TYPES),
+                description='Stream format, ndjson (default) or csv.',
+            ),
+        ],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR},
+    ),
 )
-class RecipeViewSets(viewsets.ModelViewSet):
+@extend_schema_view(
+    batch=extend_schema(
+        methods=['DELETE'],
+        parameters=[
+            OpenApiParameter(
+                'ids',
+                OpenApiTypes.STR,
+                required=True,
+                description='Comma separated recipe IDs to delete.',
+            ),
+        ],
+        responses={(200, 'application/json'): OpenApiTypes.OBJECT},
+        description=(
+            'Delete many recipes in one transaction. Results are per '
+            'item: 204 when deleted, 404 when not found.'
+        ),
+    ),
+)
+class RecipeViewSets(
+    LibraryCacheMixin,
+    AsyncReadMixin,
+    DeltaSyncMixin,
+    FastReadMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = OptInCursorPagination
+    nested_actions = {
+        "list",
+        "retrieve",
+        "update",
+        "partial_update",
+        "export",
+        "batch",
+        "similar",
+    }
+    sparse_actions = {"list", "retrieve"}
+    fast_read_actions = {"list", "retrieve", "similar"}
 
     @staticmethod
     def _params_to_ints(qs):
         return [int(str_id) for str_id in qs.split(",")]
 
+    def _batch_ids(self, required=False):
+        """Distinct ids from ``?ids=``, in order; None if not given."""
+        value = self.request.query_params.get("ids")
+        if value is None and not required:
+            return None
+        try:
+            ids = list(dict.fromkeys(
+                int(part) for part in (value or "").split(",") if part.strip()
+            ))
+        except ValueError:
+            raise ValidationError({"ids": ["Expected comma separated IDs."]})
+        if not ids:
+            raise ValidationError({"ids": ["Expected at least one ID."]})
+        if len(ids) > MAX_BATCH_SIZE:
+            raise ValidationError(
+                {"ids": [f"At most {MAX_BATCH_SIZE} IDs per request."]}
+            )
+        return ids
+
+    def _match_mode(self, param):
+        match = self.request.query_params.get(param, RecipeQuerySet.MATCH_ANY)
+        if match not in MATCH_MODES:
+            raise ValidationError({param: [f"Unsupported mode {match!r}."]})
+        return match
+
     def get_queryset(self):
         tags = self.request.query_params.get("tags")
         ingredients = self.request.query_params.get("ingredients")
         queryset = self.queryset
         if tags:
             tag_ids = RecipeViewSets._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.with_tags(
+                tag_ids, self._match_mode("tags_match")
+            )
         if ingredients:
             ingredient_ids = RecipeViewSets._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
-        return queryset.filter(user=self.request.user).order_by("-id").distinct() # noqa
+            queryset = queryset.with_ingredients(
+                ingredient_ids, self._match_mode("ingredients_match")
+            )
+        queryset = queryset.for_user(self.request.user).order_by("-id")
+        if self.action == "list":
+            ids = self._batch_ids()
+            if ids is not None:
+                queryset = queryset.filter(pk__in=ids)
+        search = self.request.query_params.get("q")
+        if search:
+            selection = self.get_field_selection()
+            queryset = queryset.search(
+                search,
+                headline=selection is None or selection.includes("headline"),
+            ).order_by("-rank", "-id")
+        return self._for_action(queryset)
+
+    def get_field_selection(self):
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, "_field_selection"):
+            serializer = self.get_serializer_class()(
+                context=super().get_serializer_context()
+            )
+            self._field_selection = fieldsets.FieldSelection.from_request(
+                self.request, serializer
+            )
+        return self._field_selection
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["field_selection"] = self.get_field_selection()
+        return context
+
+    def _for_action(self, queryset):
+        if self.get_field_selection() is not None:
+            return self._for_selection(queryset)
+        if self.action == "list" and self._batch_ids() is None:
+            queryset = queryset.defer("description")
+        if self.action in self.nested_actions:
+            queryset = queryset.with_nested()
+        return queryset
+
+    def _for_selection(self, queryset):
+        """Load only the columns and relations the pruned serializer uses."""
+        serializer = self.get_serializer()
+        nested = {}
+        for name in ("tags", "ingredients"):
+            field = serializer.fields.get(name)
+            if field is None:
+                nested[name] = None
+            elif isinstance(field, ListSerializer):
+                nested[name] = fieldsets.model_columns(field.child)
+            else:
+                nested[name] = ("id",)
+        return queryset.only(*fieldsets.model_columns(serializer)).with_nested(
+            tag_fields=nested["tags"],
+            ingredient_fields=nested["ingredients"],
+        )
 
     def get_serializer_class(self):
+        if self.action == "similar":
+            return serializers.RecipeSerializer
         if self.action == "list":
+            if self._batch_ids() is not None:
+                return self.serializer_class
+            if self.request.query_params.get("q"):
+                return serializers.RecipeSearchSerializer
             return serializers.RecipeSerializer
         elif self.action == "upload_image":
             return serializers.RecipeImageSerializer
+        elif self.action == "bulk_import":
+            return serializers.RecipeBulkImportSerializer
 
         return self.serializer_class
 
@@ -72,7 +348,12 @@ class RecipeViewSets(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            # Renditions are produced off the request path by the
+            # process_image_jobs worker; until then the list stays empty.
+            previous = recipe.image_renditions
+            recipe = serializer.save(image_renditions={})
+            images.enqueue(recipe)
+            images.delete_renditions(previous)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
@@ -83,6 +364,173 @@ class RecipeViewSets(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(methods=['GET'], detail=True, url_path='similar')
+    def similar(self, request, pk=None):
+        return self._cached(self._similar, request, pk=pk)
+
+    def _similar(self, request, pk=None):
+        options = similarity.conf()
+        try:
+            limit = int(request.query_params.get(
+                "limit", options["DEFAULT_RESULTS"]
+            ))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= options["MAX_RESULTS"]:
+            raise ValidationError({"limit": [
+                f"Expected a number from 1 to {options['MAX_RESULTS']}."
+            ]})
+        metric = request.query_params.get("metric", similarity.JACCARD)
+        if metric not in similarity.METRICS:
+            raise ValidationError({"metric": [f"Unsupported metric {metric!r}."]})
+        try:
+            recipe_id = int(pk)
+        except ValueError:
+            raise Http404
+
+        index = similarity.indexes.get(request.user.pk)
+        if recipe_id not in index:
+            raise Http404
+        scores = dict(index.similar(recipe_id, limit, metric))
+
+        queryset = self.get_queryset().filter(pk__in=scores)
+        plan = self.get_read_plan(queryset)
+        if plan is None:
+            rows = self.get_serializer(queryset, many=True).data
+        else:
+            rows = plan.render(plan.rows(queryset))
+        by_id = {row["id"]: row for row in rows}
+        return Response([
+            {**by_id[key], "similarity": round(score, 4)}
+            for key, score in scores.items() if key in by_id
+        ])
+
+    @action(methods=['PATCH', 'DELETE'], detail=False, url_path='batch')
+    def batch(self, request):
+        if request.method == "DELETE":
+            return self._batch_delete(self._batch_ids(required=True))
+        return self._batch_update(request.data)
+
+    def _batch_update(self, items):
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                {"non_field_errors": ["Expected a non-empty list of items."]}
+            )
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValidationError({"non_field_errors": [
+                f"At most {MAX_BATCH_SIZE} items per request."
+            ]})
+        ids = []
+        for item in items:
+            pk = item.get("id") if isinstance(item, dict) else None
+            if type(pk) is not int:
+                raise ValidationError({"non_field_errors": [
+                    "Every item must be an object with an integer id."
+                ]})
+            ids.append(pk)
+        if len(set(ids)) != len(ids):
+            raise ValidationError(
+                {"non_field_errors": ["Each id may appear only once."]}
+            )
+
+        with transaction.atomic():
+            recipes = self.get_queryset().select_for_update(of=("self",))
+            found = {recipe.pk: recipe for recipe in recipes.filter(pk__in=ids)}
+            results, valid = [], []
+            for pk, item in zip(ids, items):
+                recipe = found.get(pk)
+                if recipe is None:
+                    results.append({"id": pk, "status": 404})
+                    continue
+                serializer = self.get_serializer(
+                    recipe, data=item, partial=True
+                )
+                if serializer.is_valid():
+                    valid.append(serializer)
+                    results.append({"id": pk, "status": 200})
+                else:
+                    results.append({
+                        "id": pk,
+                        "status": 400,
+                        "errors": serializer.errors,
+                    })
+            if len(valid) != len(items):
+                transaction.set_rollback(True)
+                return Response(
+                    {"results": results},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            for serializer in valid:
+                serializer.save()
+
+        updated = self.get_serializer(
+            self.get_queryset().filter(pk__in=ids), many=True
+        ).data
+        by_id = {row["id"]: row for row in updated}
+        for result in results:
+            result["data"] = by_id[result["id"]]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    def _batch_delete(self, ids):
+        with transaction.atomic():
+            recipes = self.get_queryset().filter(pk__in=ids)
+            found = set(recipes.values_list("pk", flat=True))
+            Recipe.objects.filter(pk__in=found).delete()
+        results = [
+            {"id": pk, "status": 204 if pk in found else 404} for pk in ids
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='export')
+    def export(self, request):
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in exporters.CONTENT_TYPES:
+            return Response(
+                {"export_format": [f"Unsupported format {export_format!r}."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        recipes = self.get_queryset().iterator(
+            chunk_size=exporters.EXPORT_CHUNK_SIZE
+        )
+        rows = exporters.serialize(recipes, self.get_serializer_context())
+        content = exporters.render(rows, export_format)
+        if isinstance(request._request, ASGIRequest):
+            content = exporters.aiterate(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type=exporters.CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes.{export_format}"'
+        )
+        return response
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk_import(self, request):
+        if isinstance(request.data, list):
+            records = (
+                (row, data, None)
+                for row, data in enumerate(request.data, start=1)
+            )
+        else:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            upload = serializer.validated_data["file"]
+            file_format = serializer.validated_data.get(
+                "file_format",
+                importers.guess_format(upload.name),
+            )
+            # The csv module needs newline="" to keep newlines inside
+            # quoted fields; utf-8-sig drops the BOM some editors write.
+            lines = io.TextIOWrapper(
+                upload.file, encoding="utf-8-sig", newline=""
+            )
+            records = importers.parse(lines, file_format)
+
+        importer = importers.RecipeImporter(request.user).run(records)
+        return Response(importer.summary, status=status.HTTP_200_OK)
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -92,10 +540,24 @@ class RecipeViewSets(viewsets.ModelViewSet):
                 OpenApiTypes.INT, enum=[0, 1],
                 description='Filter by items assigned to recipes.',
             ),
+            OpenApiParameter(
+                'ordering',
+                OpenApiTypes.STR,
+                enum=list(ATTR_ORDERINGS),
+                description=(
+                    'Newest first (recent, default) or most used first '
+                    '(popular). Popular lists cannot be paginated.'
+                ),
+            ),
+            *SYNC_PARAMETERS,
         ]
     )
 )
 class BaseRecipeAttrViewSets(
+    LibraryCacheMixin,
+    AsyncReadMixin,
+    DeltaSyncMixin,
+    FastReadMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -103,8 +565,9 @@ class BaseRecipeAttrViewSets(
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = OptInCursorPagination
 
     def get_queryset(self):
         assigned_only = bool(
@@ -112,19 +575,36 @@ class BaseRecipeAttrViewSets(
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.assigned()
+
+        queryset = queryset.filter(user=self.request.user)
+        return queryset.order_by(*self.get_ordering())
 
-        return queryset.filter(user=self.request.user).order_by("-id").distinct() # noqa
+    def get_ordering(self):
+        ordering = self.request.query_params.get("ordering", "recent")
+        if ordering not in ATTR_ORDERINGS:
+            raise ValidationError(
+                {"ordering": [f"Unsupported ordering {ordering!r}."]}
+            )
+        if ordering == "popular" and self.paginator.is_requested(
+            self.request
+        ):
+            # recipe_count is not unique, so a cursor could only carry an
+            # OFFSET and every later page would rescan the ones before it.
+            raise ValidationError(
+                {"ordering": ["Popular lists cannot be paginated."]}
+            )
+        return ATTR_ORDERINGS[ordering]
 
     def perform_create(self, serializer):
         return serializer.save(user=self.request.user)
 
 
 class IngredientViewSets(BaseRecipeAttrViewSets):
-    serializer_class = serializers.IngredientSerializer
+    serializer_class = serializers.IngredientDetailSerializer
     queryset = Ingredient.objects.all()
 
 
 class TagViewSets(BaseRecipeAttrViewSets):
-    serializer_class = serializers.TagSerializer
+    serializer_class = serializers.TagDetailSerializer
     queryset = Tag.objects.all()
@@ -0,0 +1,215 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+DEFAULTS = {
+    "MAX_SIZE": 10_000,
+    "TTL": 60,
+    "LOCAL_TTL": 5,
+    "CACHE_ALIAS": None,
+}
+
+
+class TokenCache:
+    """Token key -> ``(user, token)`` lookups, LRU with a TTL.
+
+    Entries live in a per-process LRU and, when ``CACHE_ALIAS`` names a
+    Django cache, in that shared cache as a second level. Invalidation
+    clears both and moves the user's generation in the shared cache on,
+    which local hits are checked against, so no process keeps accepting
+    a revoked token. Without a shared cache other processes' copies
+    live on until they expire, which is why ``LOCAL_TTL`` is short.
+    """
+    key_prefix = "authtoken:"
+    user_prefix = "authtoken-user:"
+    generation_prefix = "authtoken-gen:"
+
+    def __init__(self, max_size, ttl, cache_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULTS, **getattr(settings, "TOKEN_AUTH_CACHE", {})}
+        ttl = conf["TTL"] if conf["CACHE_ALIAS"] else conf["LOCAL_TTL"]
+        return cls(conf["MAX_SIZE"], ttl, conf["CACHE_ALIAS"])
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, key):
+        value, generation = self._get_local(key)
+        if value is not None and self.shared is not None:
+            if self.shared.get(self._generation_key(value)) != generation:
+                value = None
+        if value is None and self.shared is not None:
+            entry = self.shared.get(self.key_prefix + key)
+            if entry is not None:
+                value, generation = entry
+                self._set_local(key, value, generation)
+        return value
+
+    async def aget(self, key):
+        value, generation = self._get_local(key)
+        if value is not None and self.shared is not None:
+            current = await self.shared.aget(self._generation_key(value))
+            if current != generation:
+                value = None
+        if value is None and self.shared is not None:
+            entry = await self.shared.aget(self.key_prefix + key)
+            if entry is not None:
+                value, generation = entry
+                self._set_local(key, value, generation)
+        return value
+
+    def set(self, key, value):
+        generation = None
+        if self.shared is not None:
+            generation = self.shared.get(self._generation_key(value))
+            self.shared.set_many(
+                self._shared_entries(key, value, generation), self.ttl
+            )
+        self._set_local(key, value, generation)
+
+    async def aset(self, key, value):
+        generation = None
+        if self.shared is not None:
+            generation = await self.shared.aget(self._generation_key(value))
+            await self.shared.aset_many(
+                self._shared_entries(key, value, generation), self.ttl
+            )
+        self._set_local(key, value, generation)
+
+    def _generation_key(self, value):
+        user, _ = value
+        return self.generation_prefix + str(user.pk)
+
+    def _shared_entries(self, key, value, generation):
+        user, _ = value
+        return {
+            self.key_prefix + key: (value, generation),
+            self.user_prefix + str(user.pk): key,
+        }
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, generation, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value, generation
+                del self._entries[key]
+        return None, None
+
+    def _set_local(self, key, value, generation):
+        user, _ = value
+        with self._lock:
+            self._entries[key] = (
+                value, generation, time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(key)
+            self._user_keys[user.pk] = key
+            while len(self._entries) > self.max_size:
+                _, ((evicted, _), _, _) = self._entries.popitem(last=False)
+                self._user_keys.pop(evicted.pk, None)
+
+    def discard(self, key, user_id):
+        """Drop ``key``, and every process's local entries for the user."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._user_keys.pop(user_id, None)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + key)
+            self._bump(user_id)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            key = self._user_keys.get(user_id)
+        if key is None and self.shared is not None:
+            key = self.shared.get(self.user_prefix + str(user_id))
+        if key is not None:
+            self.discard(key, user_id)
+        elif self.shared is not None:
+            self._bump(user_id)
+
+    def _bump(self, user_id):
+        # Local entries are at most ``ttl`` old, so the new generation
+        # only has to outlive them.
+        self.shared.set(
+            self.generation_prefix + str(user_id), uuid.uuid4().hex, self.ttl
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+
+token_cache = TokenCache.from_settings()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that skips the token/user join on a hit.
+
+    Only successful lookups are cached. Each request gets its own copy of
+    the cached user so per-request mutations don't leak between requests.
+    """
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            self.cache.set(key, cached)
+        user, token = cached
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views, with the lookups awaited."""
+        key = _HeaderKey(self.keyword).authenticate(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cached = await self.cache.aget(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(
+                    key=key
+                )
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _("User inactive or deleted.")
+                )
+            cached = (token.user, token)
+            await self.cache.aset(key, cached)
+        user, token = cached
+        return copy.copy(user), token
+
+
+class _HeaderKey(TokenAuthentication):
+    """Parses and validates the header like DRF, returning the raw key."""
+
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def authenticate_credentials(self, key):
+        return key
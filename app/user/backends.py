@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class TokenModelBackend(ModelBackend):
+    """``ModelBackend`` that loads the user's API token in the same query.
+
+    ``CreateTokenView`` reads ``user.auth_token`` straight after
+    authenticating, so an existing token costs no extra query.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.select_related(
+                "auth_token"
+            ).get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Hash anyway so a missing user takes as long as a wrong
+            # password, as ModelBackend does.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,37 @@
+"""Password hashers tuned through ``settings.PASSWORD_HASHING``.
+
+They keep Django's algorithm names, so hashes made by the stock hashers
+still verify. Django rehashes a password on the next successful login
+when its hasher is not the first in ``PASSWORD_HASHERS`` or its cost
+parameters differ from these, so changing either migrates users as
+they log in.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+DEFAULTS = {
+    # OWASP's argon2id baseline: 19 MiB, two passes, one lane. Django's
+    # own defaults use eight lanes and 100 MiB.
+    "ARGON2_TIME_COST": 2,
+    "ARGON2_MEMORY_COST": 19_456,
+    "ARGON2_PARALLELISM": 1,
+    "SCRYPT_WORK_FACTOR": 2**14,
+    "SCRYPT_BLOCK_SIZE": 8,
+    "SCRYPT_PARALLELISM": 1,
+}
+
+
+def conf():
+    return {**DEFAULTS, **getattr(settings, "PASSWORD_HASHING", {})}
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = conf()["ARGON2_TIME_COST"]
+    memory_cost = conf()["ARGON2_MEMORY_COST"]
+    parallelism = conf()["ARGON2_PARALLELISM"]
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = conf()["SCRYPT_WORK_FACTOR"]
+    block_size = conf()["SCRYPT_BLOCK_SIZE"]
+    parallelism = conf()["SCRYPT_PARALLELISM"]
@@ -4,6 +4,8 @@ from django.contrib.auth import (
 )
 from rest_framework import serializers
 
+from user.throttling import login_slot
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,13 +18,22 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        # One UPDATE of just the columns that changed, password included.
+        changed = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
 
         if password:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
+            changed.append('password')
+
+        if changed:
+            instance.save(update_fields=changed)
 
-        return user
+        return instance
 
 
 class AuthTokenSerializer(serializers.Serializer):
@@ -39,11 +50,13 @@ class AuthTokenSerializer(serializers.Serializer):
         if not email or not password:
             raise serializers.ValidationError("Email and password are required.") # noqa
 
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,  # authenticate uses USERNAME_FIELD
-            password=password
-        )
+        # Hashing is the expensive part of a login; see user.throttling.
+        with login_slot():
+            user = authenticate(
+                request=self.context.get('request'),
+                username=email,  # authenticate uses USERNAME_FIELD
+                password=password
+            )
 
         if not user:
             raise serializers.ValidationError(
@@ -0,0 +1,201 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+
+
+ME_URL = reverse('user:me')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test User',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_token_lookup(self):
+        self.client.get(TAGS_URL)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token not-a-real-token')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_revoked(self):
+        self.client.get(TAGS_URL)
+        self.token.delete()
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_revoked(self):
+        self.client.get(TAGS_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_is_visible_next_request(self):
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'Updated'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Updated')
+
+
+class AsyncTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(email='test@example.com', password='pass1234')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def request(self, header):
+        return Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=header))
+
+    async def test_valid_token_is_cached(self):
+        request = self.request(f'Token {self.token.key}')
+
+        user, token = await self.auth.aauthenticate(request)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+        with mock.patch.object(
+                CachedTokenAuthentication, 'get_model',
+                side_effect=AssertionError('token was looked up')):
+            user, _ = await self.auth.aauthenticate(request)
+        self.assertEqual(user, self.user)
+
+    async def test_other_schemes_are_skipped(self):
+        self.assertIsNone(
+            await self.auth.aauthenticate(self.request('Bearer abc'))
+        )
+
+    async def test_bad_tokens_are_rejected(self):
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            await self.auth.aauthenticate(self.request('Token nope'))
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token'):
+            await self.auth.aauthenticate(self.request('Token a b'))
+
+    async def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        await self.user.asave()
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'inactive'):
+            await self.auth.aauthenticate(
+                self.request(f'Token {self.token.key}')
+            )
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        self.user = create_user(email='test@example.com', password='pass1234')
+        self.token = Token.objects.create(user=self.user)
+        self.value = (self.user, self.token)
+
+    def test_entries_expire_after_ttl(self):
+        cache = TokenCache(max_size=10, ttl=-1)
+        cache.set('key', self.value)
+
+        self.assertIsNone(cache.get('key'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        other = create_user(email='other@example.com', password='pass1234')
+        cache = TokenCache(max_size=1, ttl=60)
+        cache.set('first', self.value)
+        cache.set('second', (other, self.token))
+
+        self.assertIsNone(cache.get('first'))
+        self.assertEqual(cache.get('second')[0], other)
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    })
+    def test_shared_cache_is_used_and_invalidated(self):
+        writer = TokenCache(max_size=10, ttl=60, cache_alias='default')
+        reader = TokenCache(max_size=10, ttl=60, cache_alias='default')
+        writer.set('key', self.value)
+
+        self.assertEqual(reader.get('key')[0], self.user)
+
+        writer.discard_user(self.user.pk)
+        self.assertIsNone(caches['default'].get('authtoken:key'))
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    })
+    def test_revocation_reaches_other_processes_local_entries(self):
+        other = create_user(email='other@example.com', password='pass1234')
+        other_token = Token.objects.create(user=other)
+        writer = TokenCache(max_size=10, ttl=60, cache_alias='default')
+        reader = TokenCache(max_size=10, ttl=60, cache_alias='default')
+        reader.set('key', self.value)
+        reader.set('other', (other, other_token))
+
+        writer.discard('key', self.user.pk)
+
+        self.assertIsNone(reader.get('key'))
+        self.assertEqual(reader.get('other')[0], other)
+
+    async def test_async_lookups_see_revocation(self):
+        shared = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+        with override_settings(CACHES={'default': shared}):
+            writer = TokenCache(max_size=10, ttl=60, cache_alias='default')
+            reader = TokenCache(max_size=10, ttl=60, cache_alias='default')
+            await reader.aset('key', self.value)
+            self.assertEqual((await reader.aget('key'))[0], self.user)
+
+            writer.discard_user(self.user.pk)
+
+            self.assertIsNone(await reader.aget('key'))
+
+    @override_settings(TOKEN_AUTH_CACHE={'TTL': 60, 'LOCAL_TTL': 5})
+    def test_local_only_cache_uses_the_short_ttl(self):
+        self.assertEqual(TokenCache.from_settings().ttl, 5)
+
+        with override_settings(TOKEN_AUTH_CACHE={
+            'TTL': 60, 'LOCAL_TTL': 5, 'CACHE_ALIAS': 'default',
+        }):
+            self.assertEqual(TokenCache.from_settings().ttl, 60)
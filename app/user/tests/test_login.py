@@ -0,0 +1,204 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+
+from user import throttling
+from user.hashers import Argon2PasswordHasher
+
+
+TOKEN_URL = reverse('user:token')
+PAYLOAD = {'email': 'test@example.com', 'password': 'testpass123'}
+
+
+def held_login_slots():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+            "AND classid = %s",
+            [throttling.LOCK_NAMESPACE],
+        )
+        return cursor.fetchone()[0]
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'user.hashers.Argon2PasswordHasher',
+    'user.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+])
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_new_passwords_use_the_tuned_argon2_hasher(self):
+        user = get_user_model().objects.create_user(**PAYLOAD)
+
+        hasher = identify_hasher(user.password)
+        self.assertIsInstance(hasher, Argon2PasswordHasher)
+        self.assertIn("m=19456,t=2,p=1", user.password)
+        self.assertFalse(hasher.must_update(user.password))
+
+    def test_older_hashes_are_upgraded_on_login(self):
+        for algorithm in ('pbkdf2_sha256', 'scrypt'):
+            get_user_model().objects.filter(email=PAYLOAD['email']).delete()
+            user = get_user_model().objects.create(
+                email=PAYLOAD['email'],
+                password=make_password(
+                    PAYLOAD['password'], hasher=algorithm
+                ),
+            )
+
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('argon2$'))
+            self.assertTrue(user.check_password(PAYLOAD['password']))
+
+    def test_failed_login_leaves_the_hash_alone(self):
+        encoded = make_password(PAYLOAD['password'], hasher='pbkdf2_sha256')
+        user = get_user_model().objects.create(
+            email=PAYLOAD['email'], password=encoded
+        )
+
+        res = self.client.post(
+            TOKEN_URL, {**PAYLOAD, 'password': 'wrongpass'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        user.refresh_from_db()
+        self.assertEqual(user.password, encoded)
+
+
+def contend(waiters, hold):
+    """Run ``waiters`` threads into ``login_slot()`` at once.
+
+    Each holds its slot for ``hold`` seconds. Returns how many got in and
+    how long each refused thread waited before its 429.
+    """
+    start = threading.Barrier(waiters)
+    entered, refused = [], []
+
+    def login():
+        start.wait()
+        began = time.monotonic()
+        try:
+            with throttling.login_slot():
+                entered.append(True)
+                time.sleep(hold)
+        except Throttled:
+            refused.append(time.monotonic() - began)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=login) for _ in range(waiters)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(entered), refused
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_user_model().objects.create_user(**PAYLOAD)
+
+    def test_login_releases_its_slot(self):
+        res = self.client.post(TOKEN_URL, PAYLOAD)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(held_login_slots(), 0)
+
+    def test_slot_is_released_when_authentication_fails(self):
+        res = self.client.post(TOKEN_URL, {**PAYLOAD, 'password': 'nope'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(held_login_slots(), 0)
+
+    def test_login_is_refused_when_every_slot_stays_busy(self):
+        with mock.patch.object(throttling, '_try_acquire', return_value=None), \
+                mock.patch('user.serializers.authenticate') as authenticate:
+            started = time.monotonic()
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+            waited = time.monotonic() - started
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '1')
+        self.assertGreaterEqual(waited, 0.5)
+        authenticate.assert_not_called()
+
+    def test_login_waits_briefly_for_a_slot(self):
+        with mock.patch.object(
+                throttling, '_try_acquire', side_effect=[None, None, 0]
+        ), mock.patch.object(throttling, '_release'), \
+                mock.patch.object(throttling.time, 'sleep') as sleep:
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sleep.call_count, 2)
+
+    @override_settings(LOGIN_THROTTLE={
+        'MAX_CONCURRENT_LOGINS': 2, 'MAX_WAIT_MS': 50,
+    })
+    def test_slots_held_by_other_connections_count(self):
+        other = connections.create_connection('default')
+        try:
+            with other.cursor() as cursor:
+                for slot in (0, 1):
+                    cursor.execute(
+                        "SELECT pg_advisory_lock(%s, %s)",
+                        [throttling.LOCK_NAMESPACE, slot],
+                    )
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+            self.assertEqual(
+                res.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+            )
+
+            with other.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_unlock(%s, 1)",
+                    [throttling.LOCK_NAMESPACE],
+                )
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+        finally:
+            other.close()
+
+    @override_settings(LOGIN_THROTTLE={
+        'MAX_CONCURRENT_LOGINS': 2, 'MAX_WAIT_MS': 2000,
+    })
+    def test_waiters_beyond_the_cap_get_in_as_slots_free(self):
+        entered, refused = contend(waiters=5, hold=0.05)
+
+        self.assertEqual((entered, refused), (5, []))
+        self.assertEqual(held_login_slots(), 0)
+
+    @override_settings(LOGIN_THROTTLE={
+        'MAX_CONCURRENT_LOGINS': 2, 'MAX_WAIT_MS': 100,
+    })
+    def test_waiters_beyond_the_cap_are_refused_after_waiting(self):
+        entered, refused = contend(waiters=5, hold=1)
+
+        self.assertEqual((entered, len(refused)), (2, 3))
+        for waited in refused:
+            self.assertGreaterEqual(waited, 0.1)
+            self.assertLess(waited, 1)
+        self.assertEqual(held_login_slots(), 0)
+
+    @override_settings(LOGIN_THROTTLE={'MAX_CONCURRENT_LOGINS': 0})
+    def test_cap_can_be_turned_off(self):
+        with mock.patch.object(throttling, '_try_acquire') as acquire:
+            res = self.client.post(TOKEN_URL, PAYLOAD)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        acquire.assert_not_called()
@@ -1,7 +1,10 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
 
@@ -82,6 +85,33 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('token', res.data)
 
+    @override_settings(LOGIN_THROTTLE={'MAX_CONCURRENT_LOGINS': 0})
+    def test_login_with_existing_token_is_one_read(self):
+        user = create_user(email='test@example.com', password='testpass123')
+        token = Token.objects.create(user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(TOKEN_URL, {
+                'email': 'test@example.com',
+                'password': 'testpass123'
+            }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['token'], token.key)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('SELECT'))
+
+    def test_first_login_creates_the_token(self):
+        user = create_user(email='test@example.com', password='testpass123')
+
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass123'
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['token'], Token.objects.get(user=user).key)
+
     def test_create_token_invalid_credentials(self):
         create_user(email='test@example.com', password='correctpass', name='Test') # noqa
 
@@ -174,3 +204,28 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_update_is_a_single_update_of_changed_columns(self):
+        payload = {
+            'email': self.user.email,
+            'name': 'Test User New',
+            'password': 'testnewpass123'
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(ME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(writes), 1)
+        columns = writes[0].split(' SET ')[1].split(' WHERE ')[0]
+        self.assertIn('"name"', columns)
+        self.assertIn('"password"', columns)
+        self.assertNotIn('"email"', columns)
+        self.assertNotIn('"is_active"', columns)
+
+    def test_update_without_changes_writes_nothing(self):
+        with self.assertNumQueries(0):
+            res = self.client.patch(ME_URL, {'name': self.user.name})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
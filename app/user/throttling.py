@@ -0,0 +1,90 @@
+"""A cap on how many password checks run at once, across the deployment.
+
+Hashing a password is deliberately slow, so a burst of logins can tie
+up every server worker and starve the rest of the API. ``login_slot()``
+lets at most ``MAX_CONCURRENT_LOGINS`` logins hash at a time. Slots are
+Postgres session advisory locks, so the cap is one global count shared
+by every process and host on the database, not a per-worker or
+per-host figure: size it for the whole deployment and raise it when
+adding app replicas. A slot is freed if its connection dies.
+
+Taking a slot is one query, releasing it another. A login that finds
+every slot busy retries for up to ``MAX_WAIT_MS``, since a slot frees
+up as soon as one hash finishes. Waiting holds the worker, so the wait
+is kept short; after it the login gets a 429 with ``Retry-After``.
+"""
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.exceptions import Throttled
+
+DEFAULTS = {
+    "MAX_CONCURRENT_LOGINS": 4,
+    "MAX_WAIT_MS": 500,
+    "RETRY_AFTER": 1,
+}
+# Seconds between attempts while waiting, jittered so waiters spread out.
+POLL_INTERVAL = 0.02
+# First key of the (int, int) advisory lock pair; the slot is the second.
+LOCK_NAMESPACE = 0x6C6F67
+
+
+def _conf():
+    return {**DEFAULTS, **getattr(settings, "LOGIN_THROTTLE", {})}
+
+
+def _try_acquire(slots):
+    """Take a free slot and return its number, or None if all are busy.
+
+    Slots are tried from a random start, in one round trip; the scan
+    stops at the first lock taken, so no other slot is held.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT slot FROM ("
+            "  SELECT (%s + n) %% %s AS slot FROM generate_series(0, %s) n"
+            ") slots WHERE pg_try_advisory_lock(%s, slot) LIMIT 1",
+            [random.randrange(slots), slots, slots - 1, LOCK_NAMESPACE],
+        )
+        row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def _acquire(slots, max_wait):
+    """``_try_acquire``, retried until ``max_wait`` seconds have passed."""
+    deadline = time.monotonic() + max_wait
+    while True:
+        slot = _try_acquire(slots)
+        remaining = deadline - time.monotonic()
+        if slot is not None or remaining <= 0:
+            return slot
+        time.sleep(min(remaining, POLL_INTERVAL * random.uniform(0.5, 1.5)))
+
+
+def _release(slot):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_unlock(%s, %s)", [LOCK_NAMESPACE, slot]
+        )
+
+
+@contextmanager
+def login_slot():
+    conf = _conf()
+    slots = conf["MAX_CONCURRENT_LOGINS"]
+    if not slots or connection.vendor != "postgresql":
+        yield
+        return
+    slot = _acquire(slots, conf["MAX_WAIT_MS"] / 1000)
+    if slot is None:
+        raise Throttled(
+            wait=conf["RETRY_AFTER"],
+            detail="Too many logins in progress. Try again shortly.",
+        )
+    try:
+        yield
+    finally:
+        _release(slot)
@@ -18,7 +18,17 @@ do
   sleep 2
 done
 
-python manage.py migrate --noinput
-python manage.py collectstatic --noinput
+# Only the app service migrates; workers sharing this entrypoint set
+# RUN_MIGRATIONS=0 and wait for the schema instead of racing it.
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+  python manage.py migrate --noinput
+  python manage.py collectstatic --noinput
+else
+  echo "Waiting for migrations..."
+  until python manage.py migrate --check >/dev/null 2>&1
+  do
+    sleep 2
+  done
+fi
 
 exec su-exec django-user "$@"
\ No newline at end of file
@@ -2,8 +2,14 @@
 
 set -e
 
+# uWSGI speaks the uwsgi protocol; uvicorn (SERVER_MODE=asgi) speaks HTTP.
+TEMPLATE=/etc/nginx/default.conf.tpl
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  TEMPLATE=/etc/nginx/asgi.conf.tpl
+fi
+
 envsubst '$LISTEN_PORT $APP_HOST $APP_PORT' \
-  < /etc/nginx/default.conf.tpl \
+  < "$TEMPLATE" \
   > /etc/nginx/conf.d/default.conf
 
 nginx -g 'daemon off;'
\ No newline at end of file
@@ -0,0 +1,22 @@
+#!/bin/sh
+set -e
+
+# SERVER_MODE=wsgi (default) runs uWSGI with a fixed pool of sync workers.
+# SERVER_MODE=asgi runs uvicorn, where read endpoints are async views and a
+# worker keeps serving while requests wait on the database.
+WORKERS="${SERVER_WORKERS:-4}"
+
+case "${SERVER_MODE:-wsgi}" in
+  wsgi)
+    exec uwsgi --socket :9000 --workers "$WORKERS" --master \
+      --enable-threads --module app.wsgi
+    ;;
+  asgi)
+    exec uvicorn app.asgi:application --host 0.0.0.0 --port 9000 \
+      --workers "$WORKERS" --no-access-log --proxy-headers
+    ;;
+  *)
+    echo "Unknown SERVER_MODE '$SERVER_MODE' (expected wsgi or asgi)" >&2
+    exit 1
+    ;;
+esac